@@ -0,0 +1,351 @@
+"""
+Replays synthetic gateway events through the :class:`Events` cog against
+a fake bot, pool and webhook sink, and reports how it keeps up.
+
+    python bench/events_bench.py --rate 500 --duration 10
+    python bench/events_bench.py --save events.jsonl --duration 5
+    python bench/events_bench.py --replay events.jsonl --rate 2000
+
+Nothing is sent over the network, so this runs offline in CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from configparser import ConfigParser
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from cache import GuildConfigStore
+from cogs.events import Events
+
+KINDS = ("message_edit", "channel_update", "role_update", "voice_join")
+
+
+### Fakes
+
+
+class FakePool:
+    """
+    Stands in for the asyncpg pool. Every query succeeds
+    and returns no rows.
+    """
+
+    async def fetch(self, *args: Any) -> list:
+        return []
+
+    async def execute(self, *args: Any) -> str:
+        return "OK"
+
+    async def executemany(self, *args: Any) -> None:
+        return None
+
+
+class FakeWebhook:
+    """
+    A webhook sink that takes `latency` seconds per send
+    and counts what it received.
+    """
+
+    def __init__(self, id: int, latency: float) -> None:
+        self.id = id
+        self.url = f"https://discord.invalid/api/webhooks/{id}/token"
+        self.latency = latency
+        self.messages = 0
+        self.embeds = 0
+
+    async def send(self, embeds: List[discord.Embed], **kwargs: Any) -> None:
+        await asyncio.sleep(self.latency)
+        self.messages += 1
+        self.embeds += len(embeds)
+
+
+class Asset(SimpleNamespace):
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakeUser(SimpleNamespace):
+    def __str__(self) -> str:
+        return f"user{self.id}#0001"
+
+
+class FakeChannel(SimpleNamespace):
+    def __str__(self) -> str:
+        return self.name
+
+
+def fake_guild(id: int) -> FakeChannel:
+    return FakeChannel(
+        id=id,
+        name=f"guild{id}",
+        icon=Asset(),
+        banner=Asset(),
+        default_role=SimpleNamespace(id=id),
+    )
+
+
+def fake_bot(guilds: int, config: ConfigParser) -> SimpleNamespace:
+    async def wait_until_ready() -> None:
+        return None
+
+    channels = {id: FakeChannel(id=id * 1000, name="logs") for id in range(guilds)}
+    bot = SimpleNamespace(
+        config=config,
+        loop=asyncio.get_running_loop(),
+        embed=discord.Embed,
+        cs=None,
+        user=SimpleNamespace(display_avatar=Asset()),
+        guild_config=GuildConfigStore(FakePool()),
+        wait_until_ready=wait_until_ready,
+        get_channel=lambda id: channels.get(id // 1000),
+        get_guild=lambda id: None,
+    )
+    bot.guild_config.loaded = True
+    for id in range(guilds):
+        bot.guild_config.apply(id, logs=id * 1000)
+
+    return bot
+
+
+### Event sequences
+
+
+def generate(count: int, guilds: int, seed: int) -> Iterator[dict]:
+    """
+    Yields `count` random events spread over `guilds` servers.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {
+            "kind": rng.choice(KINDS),
+            "guild": rng.randrange(guilds),
+            "user": rng.randrange(1, 10**6),
+            "size": rng.choice((20, 200, 2000)),
+            "overwrites": rng.randrange(1, 8),
+        }
+
+
+def build(event: dict) -> tuple[str, tuple]:
+    """
+    Turns a recorded event into a listener name and
+    the arguments discord.py would pass to it.
+    """
+    guild = fake_guild(event["guild"])
+    user = FakeUser(
+        id=event["user"], bot=False, mention=f"<@{event['user']}>", avatar=Asset()
+    )
+    kind = event["kind"]
+
+    if kind == "message_edit":
+        channel = FakeChannel(id=event["guild"] * 1000 + 1, name="general")
+        channel.mention = f"<#{channel.id}>"
+        before = SimpleNamespace(
+            author=user,
+            guild=guild,
+            channel=channel,
+            pinned=False,
+            content="a" * event["size"],
+        )
+        after = SimpleNamespace(**{**vars(before), "content": "b" * event["size"]})
+        return "on_message_edit", (before, after)
+
+    if kind == "channel_update":
+        overwrites = [
+            SimpleNamespace(id=index, allow=1 << index, deny=0, type=0)
+            for index in range(event["overwrites"])
+        ]
+        before = FakeChannel(
+            id=event["guild"] * 1000 + 2,
+            name="general",
+            guild=guild,
+            category=None,
+            type="text",
+            _overwrites=overwrites,
+        )
+        after = FakeChannel(
+            **{
+                **vars(before),
+                "_overwrites": [
+                    SimpleNamespace(**{**vars(overwrite), "deny": 1 << 11})
+                    for overwrite in overwrites
+                ],
+            }
+        )
+        return "on_guild_channel_update", (before, after)
+
+    if kind == "role_update":
+        before = SimpleNamespace(
+            id=event["user"],
+            guild=guild,
+            name="role",
+            colour=0,
+            permissions=discord.Permissions(0x0000_0400),
+        )
+        after = SimpleNamespace(
+            **{**vars(before), "permissions": discord.Permissions(0x0001_0C08)}
+        )
+        return "on_guild_role_update", (before, after)
+
+    voice = FakeChannel(id=event["guild"] * 1000 + 3, name="voice", type="voice")
+    member = SimpleNamespace(**vars(user), guild=guild)
+    return (
+        "on_voice_state_update",
+        (member, SimpleNamespace(channel=None), SimpleNamespace(channel=voice)),
+    )
+
+
+### Runner
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(options: argparse.Namespace) -> dict:
+    if options.replay:
+        with open(options.replay, encoding="utf-8") as file:
+            events = [json.loads(line) for line in file if line.strip()]
+        guilds = max(event["guild"] for event in events) + 1
+    else:
+        events = list(
+            generate(int(options.rate * options.duration), options.guilds, options.seed)
+        )
+        guilds = options.guilds
+
+    if options.save:
+        with open(options.save, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(event) + "\n" for event in events)
+
+    spool = tempfile.TemporaryDirectory()
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "LOGS": {
+                "spool": spool.name,
+                "concurrency": str(options.concurrency),
+                "max_delay": str(options.max_delay),
+                "burst_threshold": str(options.burst_threshold),
+            }
+        }
+    )
+
+    bot = fake_bot(guilds, config)
+    cog = Events(bot)
+    sinks = {}
+    for id in range(guilds):
+        sink = sinks[id] = FakeWebhook(id, options.send_latency)
+        cog.webhooks[id * 1000] = sink
+
+    # Lets __ainit__ start the cog's task loops.
+    await asyncio.sleep(0)
+
+    latencies: List[float] = []
+    growth: List[int] = []
+    handlers: List[asyncio.Task] = []
+
+    async def handle(name: str, args: tuple) -> None:
+        started = time.perf_counter()
+        await getattr(cog, name)(*args)
+        latencies.append(time.perf_counter() - started)
+
+    async def sample() -> None:
+        while True:
+            stats = cog.stats()
+            growth.append(stats["pending"] + stats["spool"])
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    for index, event in enumerate(events):
+        # Paced like the gateway, one task per listener call as discord.py does.
+        delay = started + index / options.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        handlers.append(asyncio.create_task(handle(*build(event))))
+
+    await asyncio.gather(*handlers)
+    replayed = time.perf_counter() - started
+
+    # Waits for the queue to drain, up to the drain timeout.
+    deadline = time.perf_counter() + options.drain_timeout
+    while time.perf_counter() < deadline:
+        stats = cog.stats()
+        if not stats["pending"] and not stats["spool"]:
+            break
+
+        await asyncio.sleep(0.05)
+
+    drained = time.perf_counter() - started
+    sampler.cancel()
+    cog.cog_unload()
+    spool.cleanup()
+
+    stats = cog.stats()
+    return {
+        "events": len(events),
+        "guilds": guilds,
+        "replay_s": round(replayed, 3),
+        "events_per_s": round(len(events) / replayed, 1),
+        "handler_p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "handler_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "handler_mean_ms": round(statistics.fmean(latencies or [0]) * 1000, 3),
+        "drain_s": round(drained, 3),
+        "queue_max": max(growth or [0]),
+        "queue_final": stats["pending"] + stats["spool"],
+        "messages_sent": sum(sink.messages for sink in sinks.values()),
+        "embeds_sent": sum(sink.embeds for sink in sinks.values()),
+        "log_p50_ms": stats["p50_ms"],
+        "log_p99_ms": stats["p99_ms"],
+        "dropped": stats["dropped"],
+        "coalesced": stats["coalesced"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=500, help="events per second")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of events")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="JSON lines of events to replay")
+    parser.add_argument("--save", help="write the replayed events to this file")
+    parser.add_argument(
+        "--send-latency", type=float, default=0.05, help="seconds per webhook send"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-delay", type=float, default=2)
+    parser.add_argument(
+        "--burst-threshold",
+        type=int,
+        default=10**9,
+        help="events per window before coalescing (default: never)",
+    )
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--json", action="store_true", help="print one JSON object")
+    options = parser.parse_args(argv)
+
+    results = asyncio.run(run(options))
+    if options.json:
+        print(json.dumps(results))
+    else:
+        width = max(map(len, results))
+        for key, value in results.items():
+            print(f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import asyncpg
+import discord
+
+
+@dataclass
+class GuildConfig:
+    """
+    A typed, in-memory copy of a single row
+    of the `guilds` table.
+    -----------------------------
+
+    A :class:`GuildConfig` with every setting left
+    as `None` is stored for guilds that have no row,
+    so repeated lookups never reach the database.
+    """
+
+    guild: int
+    prefix: Optional[str] = None
+    logs: Optional[int] = None
+    log_webhook: Optional[str] = None
+    log_events: Optional[int] = None
+    timezone: Optional[str] = None
+    mute: Optional[int] = None
+    admins: Optional[int] = None
+    mods: Optional[int] = None
+    joins: Optional[int] = None
+    leave: Optional[int] = None
+    welcome: Optional[str] = None
+    goodbye: Optional[str] = None
+    ticket_message: Optional[str] = None
+    ticket_category: Optional[int] = None
+    twitch_channel: Optional[int] = None
+    commands: Optional[list] = None
+
+    @classmethod
+    def from_record(cls, record: asyncpg.Record) -> "GuildConfig":
+        """
+        Builds a :class:`GuildConfig` from a `guilds` row,
+        ignoring any column this class does not know about.
+        """
+        return cls(**{key: record[key] for key in record.keys() if key in COLUMNS})
+
+    def logs_event(self, event: str) -> bool:
+        """
+        Returns whether the guild logs a group of events from
+        :data:`LOG_EVENTS`. Guilds that never chose log all of them.
+        """
+        return self.log_events is None or bool(self.log_events & LOG_EVENTS[event])
+
+
+COLUMNS: frozenset = frozenset(column.name for column in fields(GuildConfig))
+SETTINGS: frozenset = COLUMNS - {"guild"}
+
+_MISSING = object()
+
+# Groups of events a guild can log -> their bit in `GuildConfig.log_events`.
+LOG_EVENTS: dict[str, int] = {
+    name: 1 << bit
+    for bit, name in enumerate(
+        (
+            "messages",
+            "channels",
+            "threads",
+            "members",
+            "presences",
+            "users",
+            "server",
+            "roles",
+            "emojis",
+            "voice",
+            "stages",
+            "bans",
+            "invites",
+        )
+    )
+}
+
+
+def log_events_mask(names: Iterable[str]) -> Optional[int]:
+    """
+    Returns the `log_events` mask for a set of event group names,
+    or `None` to log every group if "all" is one of them.
+    """
+    mask = 0
+    for name in names:
+        name = name.strip().lower()
+        if name == "all":
+            return None
+
+        if name not in LOG_EVENTS:
+            raise ValueError(f"Unknown log event type: {name}")
+
+        mask |= LOG_EVENTS[name]
+
+    return mask
+
+
+class GuildConfigStore:
+    """
+    A store of :class:`GuildConfig` objects that
+    is loaded in bulk and kept up to date in place.
+    -----------------------------
+
+    Attributes
+
+    pool: :class:`Pool`
+        The connection pool used to load and
+        persist guild settings.
+
+    loaded: :class:`bool`
+        Whether :method:`load` has completed.
+    """
+
+    def __init__(self, pool: asyncpg.pool.Pool) -> None:
+        self.pool = pool
+        self.loaded = False
+        self._loaded = asyncio.Event()
+        self._configs: dict[int, GuildConfig] = {}
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._configs
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    async def load(self) -> None:
+        """
+        |coro|
+
+        Replaces the store with every row of the
+        `guilds` table using a single query.
+        """
+        self._configs = {
+            record["guild"]: GuildConfig.from_record(record)
+            for record in await self.pool.fetch("SELECT * FROM guilds")
+        }
+        self.loaded = True
+        self._loaded.set()
+
+    async def wait_loaded(self) -> None:
+        """
+        |coro|
+
+        Waits until :method:`load` has completed so
+        settings read afterwards come from the database.
+        """
+        if not self.loaded:
+            await self._loaded.wait()
+
+    def get(self, guild_id: int) -> GuildConfig:
+        """
+        Returns the :class:`GuildConfig` of a guild. Guilds
+        without a row are cached as an empty config.
+        """
+        config = self._configs.get(guild_id)
+        if config is None:
+            config = self._configs[guild_id] = GuildConfig(guild=guild_id)
+
+        return config
+
+    def apply(self, guild_id: int, **settings: Any) -> GuildConfig:
+        """
+        Updates the cached config of a guild in place
+        without writing to the database. Used when the
+        change has already been persisted elsewhere.
+        """
+        unknown = settings.keys() - SETTINGS
+        if unknown:
+            raise KeyError(f"Unknown guild setting(s): {', '.join(unknown)}")
+
+        config = self.get(guild_id)
+        for key, value in settings.items():
+            setattr(config, key, value)
+
+        return config
+
+    async def update(self, guild_id: int, **settings: Any) -> GuildConfig:
+        """
+        |coro|
+
+        Persists a change to a guild's config, creating
+        the guild's row if it does not exist yet, and then
+        updates the cached config in place. A failed write
+        leaves the cache untouched.
+        """
+        columns = list(settings)
+        placeholders = ", ".join(f"${index}" for index in range(2, len(columns) + 2))
+        assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns)
+        await self.pool.execute(
+            f"INSERT INTO guilds (guild, {', '.join(columns)}) VALUES ($1, {placeholders}) "
+            f"ON CONFLICT (guild) DO UPDATE SET {assignments}",
+            guild_id,
+            *settings.values(),
+        )
+        return self.apply(guild_id, **settings)
+
+
+class LRUCache:
+    """
+    A size-bounded, TTL-aware cache with the
+    dict-like API used by `bot.cache`.
+    -----------------------------
+
+    Attributes
+
+    maxsize: :class:`int`
+        The most entries kept before the least
+        recently used entry is evicted.
+
+    ttl: :class:`float`
+        Seconds an entry stays valid after being
+        stored. `0` disables expiry.
+
+    maxbytes: :class:`int`
+        The most bytes of values kept, measured with
+        `len()`. `0` disables the memory budget.
+
+    hits: :class:`int`
+        Lookups that returned a live entry.
+
+    misses: :class:`int`
+        Lookups that found no entry or an expired one.
+
+    evictions: :class:`int`
+        Entries dropped for size, memory or age.
+    """
+
+    def __init__(
+        self, maxsize: int = 10000, ttl: float = 0, maxbytes: int = 0
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Tuple[float, Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._data))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key, count=False) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        weight = len(value) if self.maxbytes else 0
+        if key in self._data:
+            self._remove(key)
+
+        self._data[key] = (time.monotonic(), value, weight)
+        self.bytes += weight
+        while len(self._data) > self.maxsize or (
+            self.maxbytes and self.bytes > self.maxbytes and len(self._data) > 1
+        ):
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def __delitem__(self, key: Hashable) -> None:
+        self._remove(key)
+
+    def _remove(self, key: Hashable) -> Any:
+        _, value, weight = self._data.pop(key)
+        self.bytes -= weight
+        return value
+
+    def _lookup(self, key: Hashable, count: bool = True) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return _MISSING
+
+        stored, value, _ = entry
+        if self.ttl and time.monotonic() - stored > self.ttl:
+            self._remove(key)
+            self.evictions += 1
+            if count:
+                self.misses += 1
+            return _MISSING
+
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def pop(self, key: Hashable, default: Any = _MISSING) -> Any:
+        if key in self._data:
+            return self._remove(key)
+
+        if default is _MISSING:
+            raise KeyError(key)
+
+        return default
+
+    def update(self, other: Mapping[Hashable, Any] = (), **kwargs: Any) -> None:
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the current size and counters of the cache.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class StoredMessage(NamedTuple):
+    id: int
+    author_id: int
+    channel_id: int
+    content: str
+    created_at: float
+
+
+class MessageStore:
+    """
+    A compact record of recent messages used to log deletes
+    and edits of messages that are no longer in discord.py's
+    message cache.
+    -----------------------------
+
+    Each channel keeps its `per_channel` most recent messages.
+    Once the store holds more than `max_bytes`, the channels
+    written to least recently lose their oldest messages first.
+
+    Attributes
+
+    bytes: :class:`int`
+        The approximate memory used by stored messages.
+
+    evictions: :class:`int`
+        Messages dropped for the per channel or memory limits.
+    """
+
+    # Rough size of a record besides its content.
+    OVERHEAD = 160
+
+    def __init__(
+        self, per_channel: int = 100, max_bytes: int = 8 * 1024 * 1024
+    ) -> None:
+        self.per_channel = per_channel
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._channels: OrderedDict[int, OrderedDict[int, StoredMessage]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return sum(len(messages) for messages in self._channels.values())
+
+    def _weight(self, message: StoredMessage) -> int:
+        return self.OVERHEAD + sys.getsizeof(message.content)
+
+    def _evict(self, channel_id: int) -> None:
+        messages = self._channels[channel_id]
+        _, message = messages.popitem(last=False)
+        self.bytes -= self._weight(message)
+        self.evictions += 1
+        if not messages:
+            del self._channels[channel_id]
+
+    def add(self, message: StoredMessage) -> None:
+        self.pop(message.channel_id, message.id)
+        messages = self._channels.get(message.channel_id)
+        if messages is None:
+            messages = self._channels[message.channel_id] = OrderedDict()
+        else:
+            self._channels.move_to_end(message.channel_id)
+
+        messages[message.id] = message
+        self.bytes += self._weight(message)
+
+        if len(messages) > self.per_channel:
+            self._evict(message.channel_id)
+
+        self._trim()
+
+    def _trim(self) -> None:
+        while self.bytes > self.max_bytes and self._channels:
+            self._evict(next(iter(self._channels)))
+
+    def get(self, channel_id: int, message_id: int) -> Optional[StoredMessage]:
+        messages = self._channels.get(channel_id)
+        return messages.get(message_id) if messages else None
+
+    def pop(self, channel_id: int, message_id: int) -> Optional[StoredMessage]:
+        messages = self._channels.get(channel_id)
+        message = messages.pop(message_id, None) if messages else None
+        if message is not None:
+            self.bytes -= self._weight(message)
+            if not messages:
+                del self._channels[channel_id]
+
+        return message
+
+    def edit(self, channel_id: int, message_id: int, content: str) -> None:
+        """
+        Replaces the content of a stored message in place.
+        """
+        message = self.get(channel_id, message_id)
+        if message is not None:
+            self.bytes += sys.getsizeof(content) - sys.getsizeof(message.content)
+            self._channels[channel_id][message_id] = message._replace(content=content)
+            # Edits that grow messages count towards the same budget.
+            self._trim()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the current size and counters of the store.
+        """
+        return {
+            "channels": len(self._channels),
+            "messages": len(self),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class UserLookup:
+    """
+    A shared service for `fetch_user` and `fetch_member`
+    REST lookups that merges concurrent requests for the
+    same ID into a single in-flight request.
+    -----------------------------
+
+    Results are stored in `bot.cache` and `NotFound`
+    responses are remembered for `not_found_ttl` seconds.
+
+    Attributes
+
+    requests: :class:`int`
+        REST requests actually sent.
+
+    coalesced: :class:`int`
+        Lookups that joined a request already in flight.
+    """
+
+    def __init__(self, bot, not_found_ttl: float = 60) -> None:
+        self.bot = bot
+        self.not_found = LRUCache(10000, not_found_ttl)
+        self.requests = 0
+        self.coalesced = 0
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    async def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.requests += 1
+        else:
+            self.coalesced += 1
+
+        # Shielded so one cancelled caller does not cancel the others' lookup.
+        return await asyncio.shield(future)
+
+    async def fetch_user(self, user_id: int) -> Optional[discord.User]:
+        """
+        |coro|
+
+        Returns a cached :class:`discord.User` or fetches it,
+        returning `None` if the user does not exist.
+        """
+        user: Optional[discord.User] = self.bot.cache["user"].get(user_id)
+        if isinstance(user, discord.User):
+            return user
+
+        key = ("user", user_id)
+        if key in self.not_found:
+            return None
+
+        async def fetch() -> Optional[discord.User]:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                self.not_found[key] = True
+                return None
+
+            self.bot.cache["user"].update({user.id: user})
+            return user
+
+        return await self._single_flight(key, fetch)
+
+    async def fetch_member(
+        self, guild: discord.Guild, user_id: int
+    ) -> Optional[discord.Member]:
+        """
+        |coro|
+
+        Returns a cached :class:`discord.Member` of `guild` or
+        fetches it, returning `None` if they are not a member.
+        """
+        member: Optional[discord.Member] = guild.get_member(
+            user_id
+        ) or self.bot.cache["member"].get(user_id)
+        if isinstance(member, discord.Member) and member.guild.id == guild.id:
+            return member
+
+        key = ("member", guild.id, user_id)
+        if key in self.not_found:
+            return None
+
+        async def fetch() -> Optional[discord.Member]:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                self.not_found[key] = True
+                return None
+
+            self.bot.cache["member"].update({member.id: member})
+            return member
+
+        return await self._single_flight(key, fetch)
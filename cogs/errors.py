@@ -6,6 +6,7 @@ from typing import List, Union
 import discord
 from discord.ext import commands
 from discord.ext.commands import context
+from rendering import RenderError
 
 
 class NotMod(commands.CheckFailure):
@@ -90,7 +91,7 @@ def is_admin():
         if (
             context.author.id == context.guild.owner_id
             or context.guild.get_role(
-                context.bot.admins.get(context.guild.id).get("admin")
+                context.bot.guild_config.get(context.guild.id).admins
             )
             in context.author.roles
             or has_admin(context)
@@ -112,11 +113,11 @@ def is_mod():
         if (
             context.author.id == context.guild.owner_id
             or context.guild.get_role(
-                context.bot.admins.get(context.guild.id).get("mod")
+                context.bot.guild_config.get(context.guild.id).mods
             )
             in context.author.roles
             or context.guild.get_role(
-                context.bot.admins.get(context.guild.id).get("admin")
+                context.bot.guild_config.get(context.guild.id).admins
             )
             in context.author.roles
             or has_admin(context)
@@ -135,9 +136,9 @@ def tag_perms(context: commands.Context, owner: int) -> bool:
     """
     if (
         context.author.id == context.guild.owner_id
-        or context.guild.get_role(context.bot.admins.get(context.guild.id).get("mod"))
+        or context.guild.get_role(context.bot.guild_config.get(context.guild.id).mods)
         in context.author.roles
-        or context.guild.get_role(context.bot.admins.get(context.guild.id).get("admin"))
+        or context.guild.get_role(context.bot.guild_config.get(context.guild.id).admins)
         in context.author.roles
         or has_admin(context)
         or context.author.id == owner.id
@@ -357,6 +358,9 @@ class Errors(commands.Cog):
         elif isinstance(error, commands.CheckFailure):
             await self.format_error(context, error)
 
+        elif isinstance(error, RenderError):
+            await self.format_error(context, error)
+
         elif isinstance(error, discord.Forbidden):
             await self.format_error(
                 context,
@@ -1,9 +1,336 @@
 import asyncio
+import bisect
+import contextlib
 import datetime
-from typing import List, Optional, Union
+import re
+import string
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Union
 
 import discord
 from discord.ext import commands, tasks
+from cache import MessageStore, StoredMessage
+from spool import LogSpool
+
+# Discord's limits on the embeds sent in a single message.
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+MAX_DESCRIPTION = 4096
+MAX_TITLE = 256
+MAX_FIELD_VALUE = 1024
+# Server errors a batch is retried for before it is dropped.
+MAX_RETRIES = 5
+
+
+def clamp(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def fit_embed(embed: discord.Embed) -> discord.Embed:
+    """
+    Truncates the title, author, fields and description
+    of an embed to Discord's limits so it can be sent
+    on its own.
+    """
+    if embed.title and len(embed.title) > MAX_TITLE:
+        embed.title = clamp(embed.title, MAX_TITLE)
+
+    author = embed.author
+    if author and author.name and len(author.name) > MAX_TITLE:
+        embed.set_author(
+            name=clamp(author.name, MAX_TITLE), url=author.url, icon_url=author.icon_url
+        )
+
+    for index, embed_field in enumerate(embed.fields):
+        name, value = str(embed_field.name), str(embed_field.value)
+        if len(name) > MAX_TITLE or len(value) > MAX_FIELD_VALUE:
+            embed.set_field_at(
+                index,
+                name=clamp(name, MAX_TITLE),
+                value=clamp(value, MAX_FIELD_VALUE),
+                inline=embed_field.inline,
+            )
+
+    description: str = embed.description or ""
+    overflow = max(len(embed) - MAX_EMBED_CHARS, len(description) - MAX_DESCRIPTION)
+    if overflow > 0 and description:
+        keep = max(len(description) - overflow - 1, 0)
+        embed.description = description[:keep] + "…"
+
+    return embed
+
+
+def batch_size(embeds: List[tuple[float, discord.Embed]]) -> int:
+    """
+    Returns how many of the queued embeds, taken in order,
+    fit in one message without exceeding the embed count or
+    total character limits.
+    """
+    count = characters = 0
+    for _, embed in embeds[:MAX_EMBEDS]:
+        characters += len(embed)
+        if count and characters > MAX_EMBED_CHARS:
+            break
+
+        count += 1
+
+    return count
+
+
+def is_full(embeds: List[tuple[float, discord.Embed]]) -> bool:
+    """
+    Returns whether the queued embeds fill at least
+    one message on their own.
+    """
+    return len(embeds) >= MAX_EMBEDS or batch_size(embeds) < len(embeds)
+
+
+class JoinIndex:
+    """
+    The sorted (join timestamp, member ID) pairs of the members
+    of each server, built from the member cache the first time a
+    server is queried and kept up to date from join and leave events.
+    -----------------------------
+
+    Member IDs keep entries unique, so a member already in the cache
+    when the index is built is not added again by their join event.
+    """
+
+    def __init__(self) -> None:
+        self.joins: dict[int, list[tuple[float, int]]] = {}
+
+    @staticmethod
+    def key(member: discord.Member) -> tuple[float, int]:
+        return member.joined_at.timestamp(), member.id
+
+    def position(self, member: discord.Member) -> int:
+        """
+        Returns the 1-based position of a member in the order
+        members joined their server.
+        """
+        if member.joined_at is None:
+            return 1
+
+        joins: Optional[list[tuple[float, int]]] = self.joins.get(member.guild.id)
+        if joins is None:
+            joins = self.joins[member.guild.id] = sorted(
+                self.key(user)
+                for user in member.guild.members
+                if user.joined_at is not None
+            )
+
+        return bisect.bisect_left(joins, self.key(member)) + 1
+
+    def add(self, member: discord.Member) -> None:
+        joins: Optional[list[tuple[float, int]]] = self.joins.get(member.guild.id)
+        if joins is not None and member.joined_at is not None:
+            key = self.key(member)
+            index = bisect.bisect_left(joins, key)
+            if index == len(joins) or joins[index] != key:
+                joins.insert(index, key)
+
+    def remove(self, member: discord.Member) -> None:
+        joins: Optional[list[tuple[float, int]]] = self.joins.get(member.guild.id)
+        if joins is not None and member.joined_at is not None:
+            key = self.key(member)
+            index = bisect.bisect_left(joins, key)
+            if index < len(joins) and joins[index] == key:
+                del joins[index]
+
+
+# Permission bit -> display name, e.g. 0x20 -> "Manage Server".
+# Aliases follow the flag they alias, so the first name is kept.
+PERMISSION_NAMES: dict[int, str] = {}
+for name, value in discord.Permissions.VALID_FLAGS.items():
+    PERMISSION_NAMES.setdefault(
+        value, name.replace("_", " ").replace("guild", "server").title()
+    )
+
+
+def permission_names(bits: int) -> List[str]:
+    """
+    Returns the display names of the permissions set in `bits`,
+    visiting only the bits that are set.
+    """
+    names = []
+    while bits:
+        bit = bits & -bits
+        names.append(PERMISSION_NAMES.get(bit, f"Unknown ({bit})"))
+        bits ^= bit
+
+    return names
+
+
+# Placeholders usable in welcome and goodbye messages, each
+# evaluated only when a template uses it.
+PLACEHOLDERS: dict[str, Callable[["Events", Any, discord.Member], Any]] = {
+    "user": lambda events, channel, member: member.mention,
+    "user_id": lambda events, channel, member: member.id,
+    "user_name": lambda events, channel, member: member.name,
+    "user_discriminator": lambda events, channel, member: member.discriminator,
+    "user_avatar": lambda events, channel, member: member.avatar.url,
+    "server": lambda events, channel, member: member.guild.name,
+    "server_id": lambda events, channel, member: member.guild.id,
+    "server_icon": lambda events, channel, member: member.guild.icon.url,
+    "server_owner_id": lambda events, channel, member: member.guild.owner.id,
+    "server_owner": lambda events, channel, member: member.guild.owner.mention,
+    "server_region": lambda events, channel, member: member.guild.region,
+    "server_members": lambda events, channel, member: member.guild.member_count,
+    "channel": lambda events, channel, member: channel.mention,
+    "channel_name": lambda events, channel, member: channel.name,
+    "channel_id": lambda events, channel, member: channel.id,
+    "user_bot": lambda events, channel, member: member.bot,
+    "server_verification": lambda events, channel, member: (
+        member.guild.verification_level
+    ),
+    "server_joined_at": lambda events, channel, member: (
+        member.guild.me.joined_at.strftime("%b. %d, %Y")
+    ),
+    "channel_type": lambda events, channel, member: channel.type[0],
+    "user_position": lambda events, channel, member: (
+        events.join_index.position(member)
+    ),
+    "server_created_at": lambda events, channel, member: (
+        member.guild.created_at.strftime("%b. %d")
+    ),
+    "user_created_at": lambda events, channel, member: (
+        member.created_at.strftime("%b. %d")
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Template:
+    """
+    A welcome or goodbye message parsed once into
+    the placeholders it actually uses.
+    """
+
+    text: str
+    fields: frozenset
+
+    @classmethod
+    def compile(cls, text: str) -> "Template":
+        fields = frozenset(
+            re.match(r"[^.\[]*", name).group()
+            for _, name, _, _ in string.Formatter().parse(text)
+            if name is not None
+        )
+        return cls(text, fields & PLACEHOLDERS.keys())
+
+    def render(self, events: "Events", channel: Any, member: discord.Member) -> str:
+        return self.text.format_map(
+            {name: PLACEHOLDERS[name](events, channel, member) for name in self.fields}
+        )
+
+
+# Event kinds folded into summaries during floods -> the summary
+# label and whether the number of users involved is meaningful.
+BURSTS: dict[str, tuple[str, bool]] = {
+    "message_delete": ("message(s) deleted", True),
+    "invite_create": ("invite(s) created", True),
+    "voice_state_update": ("voice channel change(s)", True),
+    "member_join": ("member(s) joined", False),
+    "member_remove": ("member(s) left", False),
+    "member_update": ("member profile update(s)", False),
+    "member_ban": ("member(s) banned", False),
+}
+
+
+@dataclass
+class Burst:
+    """
+    Events of one kind in one server folded into a summary.
+    """
+
+    started: float = field(default_factory=time.monotonic)
+    count: int = 0
+    users: set = field(default_factory=set)
+    channels: Counter = field(default_factory=Counter)
+
+
+class Coalescer:
+    """
+    Notices when events of one kind arrive in a server faster
+    than `threshold` per `window` seconds and folds the rest of
+    them into a :class:`Burst` until the rate drops again.
+    -----------------------------
+
+    Attributes
+
+    folded: :class:`int`
+        Events folded into a burst instead of being logged.
+    """
+
+    def __init__(self, threshold: int = 10, window: float = 10) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.folded = 0
+        self.recent: dict[tuple[int, str], deque[float]] = {}
+        self.bursts: dict[tuple[int, str], Burst] = {}
+
+    def hit(
+        self,
+        guild: int,
+        kind: str,
+        user: Optional[int] = None,
+        channel: Optional[int] = None,
+    ) -> bool:
+        """
+        Records an event and returns whether it was folded
+        into a burst rather than needing its own log entry.
+        """
+        key = (guild, kind)
+        burst: Optional[Burst] = self.bursts.get(key)
+        if burst is None:
+            now = time.monotonic()
+            recent = self.recent.setdefault(key, deque())
+            recent.append(now)
+            while recent[0] <= now - self.window:
+                recent.popleft()
+
+            if len(recent) <= self.threshold:
+                return False
+
+            del self.recent[key]
+            burst = self.bursts[key] = Burst()
+
+        self.folded += 1
+        burst.count += 1
+        if user:
+            burst.users.add(user)
+        if channel:
+            burst.channels[channel] += 1
+
+        return True
+
+    def drain(self) -> List[tuple[int, str, Burst]]:
+        """
+        Returns the bursts collected since the last call. Bursts that
+        stayed under the threshold end, so their events are logged
+        one by one again.
+        """
+        now = time.monotonic()
+        for key, recent in list(self.recent.items()):
+            while recent and recent[0] <= now - self.window:
+                recent.popleft()
+
+            if not recent:
+                del self.recent[key]
+
+        drained = []
+        for key, burst in list(self.bursts.items()):
+            if burst.count:
+                drained.append((*key, burst))
+
+            if burst.count > self.threshold:
+                self.bursts[key] = Burst()
+            else:
+                del self.bursts[key]
+
+        return drained
 
 
 class Events(commands.Cog):
@@ -15,8 +342,59 @@ class Events(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.embeds = {}
-        self.logs = {}
         self.webhooks = {}
+        self.join_index = JoinIndex()
+        # Messages kept to log deletes and edits missed by the message cache.
+        self.messages = MessageStore(
+            self.bot.config.getint("CACHE", "messages_per_channel", fallback=100),
+            self.bot.config.getint("CACHE", "message_store_mb", fallback=8)
+            * 1024
+            * 1024,
+        )
+        # (Guild ID, event) -> the compiled welcome or goodbye message.
+        self.templates: dict[tuple[int, str], Template] = {}
+
+        # Limits how many guild queues are flushed at once.
+        self.flushing = asyncio.Semaphore(
+            self.bot.config.getint("LOGS", "concurrency", fallback=8)
+        )
+        # Webhook ID -> monotonic time it may send again after a 429 or 5xx.
+        self.cooldowns: dict[int, float] = {}
+        # Guild ID -> event that wakes its running flush early.
+        self.wakeups: dict[int, asyncio.Event] = {}
+        # Seconds a partial batch waits for more events before being sent.
+        self.max_delay: float = self.bot.config.getfloat(
+            "LOGS", "max_delay", fallback=2
+        )
+
+        # Events kept in memory per server before the rest are spooled
+        # to disk, and the most spooled before `overflow` applies.
+        self.max_pending = self.bot.config.getint("LOGS", "max_pending", fallback=100)
+        self.max_spooled = self.bot.config.getint(
+            "LOGS", "max_spooled", fallback=5000
+        )
+        # Either "drop" to discard events past `max_spooled` or "coalesce"
+        # to also log how many were discarded once the server catches up.
+        self.overflow = self.bot.config.get("LOGS", "overflow", fallback="coalesce")
+        self.spool = LogSpool(self.bot.config.get("LOGS", "spool", fallback="spool"))
+        # Guild ID -> events dropped since the last summary was logged.
+        self.skipped: dict[int, int] = {}
+        # Set once unloaded, when the spool belongs to the next instance.
+        self.closed = False
+
+        self.coalescer = Coalescer(
+            self.bot.config.getint("LOGS", "burst_threshold", fallback=10),
+            self.bot.config.getfloat("LOGS", "burst_window", fallback=10),
+        )
+        self.summarize_bursts.change_interval(seconds=self.coalescer.window)
+
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.retried = 0
+        self.spooled = 0
+        self.dropped = 0
+        self.latencies: deque[float] = deque(maxlen=1024)
 
         self.bot.loop.create_task(self.__ainit__())
 
@@ -27,6 +405,11 @@ class Events(commands.Cog):
         An asynchronous version of :method:`__init__`
         to access coroutines.
         """
+        await self.bot.wait_until_ready()
+        await self.bot.guild_config.wait_loaded()
+
+        await self.replay_spool()
+        self.summarize_bursts.start()
         await self.dispatch_events.start()
 
     def cog_unload(self) -> None:
@@ -36,82 +419,355 @@ class Events(commands.Cog):
         close after finishing final iteration.
         """
         self.dispatch_events.stop()
+        self.summarize_bursts.stop()
+        self.closed = True
+        # Pending events are written out and replayed by the next instance.
+        for guild, queue in self.embeds.items():
+            self.spool.persist(guild, queue["embeds"])
+            queue["embeds"].clear()
+
+        self.spool.write()
+        for wakeup in self.wakeups.values():
+            wakeup.set()
         super().cog_unload()
 
+    async def replay_spool(self) -> None:
+        """
+        |coro|
+
+        Queues the events left in the spool by a previous
+        run, discarding those of servers without a log channel.
+        """
+        for guild in list(self.spool.sizes):
+            channel = await self.log_channel(guild)
+            webhook = await self.prepare_webhook(channel) if channel else None
+            if not webhook:
+                self.dropped += self.spool.discard(guild)
+                continue
+
+            self.embeds.setdefault(guild, {"webhook": webhook, "embeds": []})
+            self.refill(guild)
+            self.schedule_flush(guild)
+
     @tasks.loop(seconds=10, reconnect=True)
     async def dispatch_events(self) -> None:
         """
         |coro|
 
-        A running task loop that repeats after each iteration
-        asynchronously to to check if a server has any
-        pending outgoing events and dispatches them.
-        """
-        if len(self.embeds) >= 1:
-            for guild in iter(self.embeds):
-                if len(self.embeds[guild]["embeds"]) > 0:
-                    webhook: discord.Webhook = self.embeds[guild]["webhook"]
-                    embeds: List[discord.Embed] = self.embeds[guild]["embeds"][:10]
-                    if webhook:
-                        try:
-                            await webhook.send(
-                                embeds=embeds,
-                                avatar_url=self.bot.user.display_avatar.url,
-                            )
-                        except discord.HTTPException:
-                            for embed in embeds:
-                                await webhook.send(
-                                    embed=embed,
-                                    avatar_url=self.bot.user.display_avatar.url,
-                                )
-                                await asyncio.sleep(1)
-
-                        del self.embeds[guild]["embeds"][:10]
-
-    async def prepare_webhook(self, channel: discord.TextChannel) -> discord.Webhook:
+        A running task loop kept as a backstop that restarts
+        the flush of any server with pending outgoing events
+        whose flush is not running, and writes spooled events
+        not yet written by a server's flush.
+        """
+        self.spool.write()
+        for guild, queue in self.embeds.items():
+            if queue["embeds"]:
+                self.schedule_flush(guild)
+
+    @tasks.loop(seconds=10, reconnect=True)
+    async def summarize_bursts(self) -> None:
         """
         |coro|
 
-        Returns a `Webhook` for dispatching events.
+        A running task loop that logs one summary for each
+        kind of event that flooded a server since the
+        previous iteration.
         """
-        if self.webhooks.get(channel.guild.id):
-            return discord.Webhook.from_url(
-                self.webhooks[channel.guild.id], session=self.bot.cs
+        for guild, kind, burst in self.coalescer.drain():
+            channel = await self.log_channel(guild)
+            if not channel:
+                continue
+
+            webhook = await self.prepare_webhook(channel)
+
+            label, by_users = BURSTS[kind]
+            description = f"{burst.count} {label}"
+            if by_users and burst.users:
+                description += f" by {len(burst.users)} user(s)"
+
+            if burst.channels:
+                channels = burst.channels.most_common(3)
+                description += " in " + ", ".join(f"<#{id}>" for id, _ in channels)
+
+            seconds = round(time.monotonic() - burst.started)
+            embed: discord.Embed = self.bot.embed(
+                description=f"{description} in the last {seconds}s.",
+                color=0xE67E22,
             )
 
+            self.queue_embeds(guild, webhook, embed)
+
+    def schedule_flush(self, guild: int) -> None:
+        """
+        Makes sure a server's pending events will be flushed,
+        waking its flush at once if they fill a message.
+        """
+        wakeup: Optional[asyncio.Event] = self.wakeups.get(guild)
+        if wakeup is None:
+            wakeup = self.wakeups[guild] = asyncio.Event()
+            self.bot.loop.create_task(self.flush_later(guild, wakeup))
+
+        if is_full(self.embeds[guild]["embeds"]):
+            wakeup.set()
+
+    async def flush_later(self, guild: int, wakeup: asyncio.Event) -> None:
+        """
+        |coro|
+
+        Flushes a server's pending events until none are left.
+        A partial batch is held until its oldest event is
+        `max_delay` seconds old, while full batches are sent
+        back to back.
+        """
+        queue: dict = self.embeds[guild]
         try:
-            webhooks = await channel.webhooks()
-            if webhooks:
-                for webhook in webhooks:
-                    if webhook.token:
-                        return webhook
-
-            webhook = await channel.create_webhook(name="Synico")
-            self.webhooks[channel.guild.id] = webhook.url
-            return webhook
-        except (discord.Forbidden, discord.HTTPException):
-            pass
+            while queue["embeds"]:
+                if not wakeup.is_set() and not is_full(queue["embeds"]):
+                    oldest: float = queue["embeds"][0][0]
+                    delay = oldest + self.max_delay - time.monotonic()
+                    if delay > 0:
+                        with contextlib.suppress(asyncio.TimeoutError):
+                            await asyncio.wait_for(wakeup.wait(), delay)
+
+                wakeup.clear()
+
+                webhook: discord.Webhook = queue["webhook"]
+                cooldown = self.cooldowns.get(webhook.id, 0) - time.monotonic()
+                if cooldown > 0:
+                    await asyncio.sleep(cooldown)
+
+                await self.flush_guild(guild)
+        except Exception as error:
+            # Restarted by the next event or by the backstop loop.
+            print(f"Failed to dispatch events for {guild}:", error)
+        finally:
+            del self.wakeups[guild]
+
+    async def flush_guild(self, guild: int) -> None:
+        """
+        |coro|
+
+        Sends the next batch of a server's pending events.
+        """
+        queue: dict = self.embeds[guild]
+        webhook: discord.Webhook = queue["webhook"]
+
+        async with self.flushing:
+            # After a rejected batch its events are sent one at a time
+            # so only the embed Discord rejected is dropped.
+            size = 1 if queue.get("isolate") else batch_size(queue["embeds"])
+            batch: List[tuple[float, discord.Embed]] = queue["embeds"][:size]
+            try:
+                await webhook.send(
+                    embeds=[embed for _, embed in batch],
+                    avatar_url=self.bot.user.display_avatar.url,
+                )
+            except discord.HTTPException as error:
+                if error.status == 429:
+                    # Left queued and retried once the webhook's bucket resets.
+                    self.rate_limited += 1
+                    retry_after = float(error.response.headers.get("Retry-After", 5))
+                    self.cooldowns[webhook.id] = time.monotonic() + retry_after
+                    return
+
+                if error.status in (401, 404):
+                    # The webhook was deleted, the batch is sent with its replacement.
+                    await self.replace_webhook(guild, webhook)
+                    return
+
+                retries = queue.get("retries", 0)
+                if error.status >= 500 and retries < MAX_RETRIES:
+                    # Left queued and retried with an exponential backoff.
+                    self.retried += 1
+                    queue["retries"] = retries + 1
+                    self.cooldowns[webhook.id] = time.monotonic() + 2**retries
+                    return
+
+                if error.status == 400 and len(batch) > 1:
+                    queue["isolate"] = len(batch)
+                    return
+
+                self.failed += len(batch)
+                print(f"Failed to dispatch events for {guild}:", error)
+            else:
+                for queued, _ in batch:
+                    self.record_sent(queued)
+
+            queue["retries"] = 0
+            if queue.get("isolate"):
+                queue["isolate"] -= len(batch)
+
+            # Events queued while sending were appended after the batch.
+            del queue["embeds"][: len(batch)]
+            self.refill(guild)
+
+    def queue_embeds(
+        self, guild: int, webhook: Optional[discord.Webhook], *embeds: discord.Embed
+    ) -> None:
+        """
+        Adds embeds to a server's pending outgoing events,
+        stamped with the time they were queued.
+        """
+        queue: Optional[dict] = self.embeds.get(guild)
+        if queue is None:
+            if not webhook:
+                return
+
+            queue = self.embeds[guild] = {"webhook": webhook, "embeds": []}
+        elif webhook:
+            # Follows the log channel when a server moves it.
+            queue["webhook"] = webhook
+
+        queued = time.monotonic()
+        entries = [(queued, fit_embed(embed)) for embed in embeds]
+
+        # Once a server has spooled events, newer ones queue behind them.
+        room = 0 if self.spool.size(guild) else self.max_pending - len(queue["embeds"])
+        room = max(room, 0)
+        queue["embeds"].extend(entries[:room])
+        if entries[room:]:
+            self.spill(guild, entries[room:])
+
+        self.schedule_flush(guild)
+
+    def spill(self, guild: int, entries: List[tuple[float, discord.Embed]]) -> None:
+        """
+        Spools events that do not fit in memory, dropping
+        those past `max_spooled` by the `overflow` policy.
+        """
+        space = max(self.max_spooled - self.spool.size(guild), 0)
+        if space:
+            self.spool.append(guild, entries[:space])
+            self.spooled += len(entries[:space])
 
-    async def log_channel(self, guild: int) -> Optional[discord.TextChannel]:
+        dropped = len(entries) - space
+        if dropped > 0:
+            self.dropped += dropped
+            if self.overflow == "coalesce":
+                self.skipped[guild] = self.skipped.get(guild, 0) + dropped
+
+    def refill(self, guild: int) -> None:
+        """
+        Moves a server's oldest spooled events into memory
+        as room frees up, followed by a summary of dropped
+        events once the spool is empty.
+        """
+        if self.closed:
+            return
+
+        queue: dict = self.embeds[guild]
+        room = self.max_pending - len(queue["embeds"])
+        if room > 0 and self.spool.size(guild):
+            queue["embeds"].extend(self.spool.take(guild, room))
+
+        if not self.spool.size(guild) and self.skipped.get(guild):
+            embed: discord.Embed = self.bot.embed(
+                description=f"{self.skipped.pop(guild)} event(s) were not logged "
+                "because too many happened at once.",
+                color=0xE74C3C,
+            )
+            queue["embeds"].append((time.monotonic(), embed))
+
+    def record_sent(self, queued: float) -> None:
+        self.sent += 1
+        self.latencies.append(time.monotonic() - queued)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the number of pending events, counters and
+        the time from an event being queued to being sent
+        over the most recent events in milliseconds.
+        """
+        latencies = sorted(self.latencies) or [0]
+        return {
+            "pending": sum(len(queue["embeds"]) for queue in self.embeds.values()),
+            "sent": self.sent,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "retried": self.retried,
+            "spool": sum(self.spool.sizes.values()),
+            "spooled": self.spooled,
+            "dropped": self.dropped,
+            "coalesced": self.coalescer.folded,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        }
+
+    async def prepare_webhook(
+        self, channel: discord.TextChannel
+    ) -> Optional[discord.Webhook]:
         """
         |coro|
 
-        Either returns a `TextChannel` or `None` if a server has a
-        channel setup for logging events.
+        Returns a `Webhook` for dispatching events, reusing the one
+        saved for the log channel before looking one up or creating it.
         """
-        if not self.logs.get(guild):
-            channel: Optional[int] = await self.bot.pool.fetchval(
-                "SELECT logs FROM guilds WHERE guild = $1", guild
+        webhook: Optional[discord.Webhook] = self.webhooks.get(channel.id)
+        if webhook:
+            return webhook
+
+        config = self.bot.guild_config.get(channel.guild.id)
+        if config.log_webhook and config.logs == channel.id:
+            webhook = self.webhooks[channel.id] = discord.Webhook.from_url(
+                config.log_webhook, session=self.bot.cs
             )
-            if channel:
-                log_channel: discord.TextChannel = self.bot.get_channel(channel)
-                self.logs[guild] = log_channel
-                return self.logs[guild]
+            return webhook
 
+        try:
+            for webhook in await channel.webhooks():
+                if webhook.token:
+                    break
+            else:
+                webhook = await channel.create_webhook(name="Synico")
+        except (discord.Forbidden, discord.HTTPException):
             return None
 
+        webhook = self.webhooks[channel.id] = discord.Webhook.from_url(
+            webhook.url, session=self.bot.cs
+        )
+        await self.bot.guild_config.update(channel.guild.id, log_webhook=webhook.url)
+        return webhook
+
+    async def replace_webhook(self, guild: int, webhook: discord.Webhook) -> None:
+        """
+        |coro|
+
+        Forgets a webhook that no longer exists and moves a server's
+        pending events to a new one, dropping them if none can be made.
+        """
+        for channel, cached in list(self.webhooks.items()):
+            if cached.id == webhook.id:
+                del self.webhooks[channel]
+
+        if self.bot.guild_config.get(guild).log_webhook == webhook.url:
+            await self.bot.guild_config.update(guild, log_webhook=None)
+
+        channel = await self.log_channel(guild)
+        replacement = await self.prepare_webhook(channel) if channel else None
+
+        queue: dict = self.embeds[guild]
+        if replacement:
+            queue["webhook"] = replacement
         else:
-            return self.logs[guild]
+            self.failed += len(queue["embeds"]) + self.spool.discard(guild)
+            queue["embeds"].clear()
+
+    async def log_channel(
+        self, guild: int, event: Optional[str] = None
+    ) -> Optional[discord.TextChannel]:
+        """
+        |coro|
+
+        Either returns a `TextChannel` or `None` if a server has a
+        channel setup for logging events and logs the `event` group.
+        Listeners call this first so unlogged events cost nothing.
+        """
+        config = self.bot.guild_config.get(guild)
+        if config.logs and (event is None or config.logs_event(event)):
+            return self.bot.get_channel(config.logs)
+
+        return None
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message) -> None:
@@ -119,8 +775,14 @@ class Events(commands.Cog):
         An event called when a message is deleted.
         """
         if not message.author.bot:
-            channel = await self.log_channel(message.guild.id)
-            if channel:
+            channel = await self.log_channel(message.guild.id, "messages")
+            # Folded events are only counted, so nothing is built for them.
+            if channel and not self.coalescer.hit(
+                message.guild.id,
+                "message_delete",
+                message.author.id,
+                message.channel.id,
+            ):
                 webhook = await self.prepare_webhook(channel)
 
                 embed: discord.Embed = self.bot.embed(
@@ -132,15 +794,107 @@ class Events(commands.Cog):
                     name=f"{message.author}", icon_url=message.author.avatar.url
                 )
 
-                if self.embeds.get(message.guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[message.guild.id][
-                        "embeds"
-                    ].append(embed)
+                self.queue_embeds(message.guild.id, webhook, embed)
+
+    @commands.Cog.listener("on_message")
+    async def store_message(self, message: discord.Message) -> None:
+        if (
+            message.guild
+            and not message.author.bot
+            and message.content
+            and await self.log_channel(message.guild.id, "messages")
+        ):
+            self.messages.add(
+                StoredMessage(
+                    message.id,
+                    message.author.id,
+                    message.channel.id,
+                    message.content,
+                    message.created_at.timestamp(),
+                )
+            )
 
-                    self.embeds[message.guild.id].update(embed=embeds)
-                    return
+    @commands.Cog.listener()
+    async def on_raw_message_delete(
+        self, payload: discord.RawMessageDeleteEvent
+    ) -> None:
+        """
+        An event called when any message is deleted. Messages still
+        in the message cache are logged by :method:`on_message_delete`.
+        """
+        stored = self.messages.pop(payload.channel_id, payload.message_id)
+        if payload.cached_message or not stored or not payload.guild_id:
+            return
+
+        channel = await self.log_channel(payload.guild_id, "messages")
+        if channel and not self.coalescer.hit(
+            payload.guild_id, "message_delete", stored.author_id, stored.channel_id
+        ):
+            webhook = await self.prepare_webhook(channel)
+
+            embed: discord.Embed = self.bot.embed(
+                description=f"<@{stored.author_id}> deleted a message in "
+                f"<#{stored.channel_id}>:\n\n{stored.content}",
+                color=0xE74C3C,
+            )
+            guild: Optional[discord.Guild] = self.bot.get_guild(payload.guild_id)
+            author = guild and guild.get_member(stored.author_id)
+            if author:
+                embed.set_author(name=str(author), icon_url=author.display_avatar.url)
+
+            self.queue_embeds(payload.guild_id, webhook, embed)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(
+        self, payload: discord.RawMessageUpdateEvent
+    ) -> None:
+        """
+        An event called when any message is edited. Messages still
+        in the message cache are logged by :method:`on_message_edit`.
+        """
+        content: Optional[str] = payload.data.get("content")
+        stored = self.messages.get(payload.channel_id, payload.message_id)
+        if content is None or stored is None:
+            return
+
+        self.messages.edit(payload.channel_id, payload.message_id, content)
+        if payload.cached_message or stored.content == content or not payload.guild_id:
+            return
 
-                self.embeds[message.guild.id] = {"webhook": webhook, "embeds": [embed]}
+        channel = await self.log_channel(payload.guild_id, "messages")
+        if channel:
+            webhook = await self.prepare_webhook(channel)
+
+            header = (
+                f"<@{stored.author_id}> edited a message in <#{stored.channel_id}>:"
+            )
+            if len(stored.content + content) >= 4000:
+                # Too long for one embed, so each version gets its own.
+                descriptions = [
+                    f"{header}\n\nOriginal:\n{stored.content}",
+                    f"{header}\n\nEdited:\n{content}",
+                ]
+            else:
+                descriptions = [
+                    f"{header}\n\nOriginal:\n{stored.content}\n\nEdited:\n{content}"
+                ]
+
+            guild: Optional[discord.Guild] = self.bot.get_guild(payload.guild_id)
+            author = guild and guild.get_member(stored.author_id)
+
+            embeds = []
+            for description in descriptions:
+                embed: discord.Embed = self.bot.embed(
+                    description=description, color=0xE67E22
+                )
+                if author:
+                    embed.set_author(
+                        name=str(author), icon_url=author.display_avatar.url
+                    )
+
+                embeds.append(embed)
+
+            self.queue_embeds(payload.guild_id, webhook, *embeds)
 
     @commands.Cog.listener()
     async def on_raw_bulk_message_delete(
@@ -149,8 +903,11 @@ class Events(commands.Cog):
         """
         An event called when a bulk amount of messages are deleted.
         """
+        for message_id in payload.message_ids:
+            self.messages.pop(payload.channel_id, message_id)
+
         if len(payload.cached_messages) >= 10:
-            channel = await self.log_channel(payload.guild_id)
+            channel = await self.log_channel(payload.guild_id, "messages")
             if channel:
                 webhook = await self.prepare_webhook(channel)
 
@@ -163,15 +920,7 @@ class Events(commands.Cog):
                 )
                 embed.set_author(name=str(guild), icon_url=guild.icon.url)
 
-                if self.embeds.get(payload.guild_id, None):
-                    embeds: List[discord.Embed] = self.embeds[payload.guild_id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[payload.guild_id].update(embed=embeds)
-                    return
-
-                self.embeds[payload.guild_id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(payload.guild_id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_message_edit(
@@ -181,7 +930,7 @@ class Events(commands.Cog):
         An event called when a message has been edited.
         """
         if not before.author.bot:
-            channel = await self.log_channel(before.guild.id)
+            channel = await self.log_channel(before.guild.id, "messages")
             if channel:
                 webhook = await self.prepare_webhook(channel)
 
@@ -240,21 +989,14 @@ class Events(commands.Cog):
 
                     embeds.append(embed)
 
-                if self.embeds.get(before.guild.id, None):
-                    embed: discord.Embed = self.embeds[before.guild.id]["embeds"]
-                    embed.extend(embeds)
-
-                    self.embeds[before.guild.id].update(embed=embed)
-                    return
-
-                self.embeds[before.guild.id] = {"webhook": webhook, "embeds": embeds}
+                self.queue_embeds(before.guild.id, webhook, *embeds)
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
         """
         An event called when a channel has been created.
         """
-        log_channel = await self.log_channel(channel.guild.id)
+        log_channel = await self.log_channel(channel.guild.id, "channels")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -264,22 +1006,14 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{channel.guild}", icon_url=channel.guild.icon.url)
 
-            if self.embeds.get(channel.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[channel.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[channel.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[channel.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(channel.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel) -> None:
         """
         An event called when a channel has been deleted.
         """
-        log_channel = await self.log_channel(channel.guild.id)
+        log_channel = await self.log_channel(channel.guild.id, "channels")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -289,15 +1023,7 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{channel.guild}", icon_url=channel.guild.icon.url)
 
-            if self.embeds.get(channel.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[channel.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[channel.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[channel.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(channel.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_channel_update(
@@ -306,79 +1032,73 @@ class Events(commands.Cog):
         """
         An event called whenever a channel is updated.
         """
-        channel = await self.log_channel(before.guild.id)
+        channel = await self.log_channel(before.guild.id, "channels")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
             changes = None
 
-            before_overwrites: dict[int, discord.PermissionOverwrite] = {
-                role.id: dict(overwrite)
-                for role, overwrite in before.overwrites.items()
+            # The raw (allow, deny) pairs, avoiding a PermissionOverwrite per target.
+            before_overwrites: dict[int, tuple[int, int]] = {
+                overwrite.id: (overwrite.allow, overwrite.deny)
+                for overwrite in before._overwrites
             }
-            after_overwrites: dict[int, discord.PermissionOverwrite] = {
-                role.id: dict(overwrite) for role, overwrite in after.overwrites.items()
+            after_overwrites: dict[int, tuple[int, int]] = {
+                overwrite.id: (overwrite.allow, overwrite.deny)
+                for overwrite in after._overwrites
+            }
+            members = {
+                overwrite.id
+                for overwrite in (*before._overwrites, *after._overwrites)
+                if overwrite.type == 1
             }
 
-            role = []
-            enabled = []
-            defaulted = []
-            disabled = []
-
-            for before_role, after_role in zip(
-                iter(before_overwrites), iter(after_overwrites)
-            ):
-                if before_role not in after_overwrites.keys():
-                    changes = f"Permissions: Special permissions removed for <@&{before_role}>"
-                    break
-
-                elif before_role in after_overwrites.keys():
-                    for before_overwrite, after_overwrite in zip(
-                        before_overwrites[before_role].items(),
-                        after_overwrites[after_role].items(),
-                    ):
-                        before_keys, before_value = before_overwrite
-                        after_keys, after_value = after_overwrite
-
-                        if before_value != after_value:
-                            permission = {
-                                True: "Enabled",
-                                False: "Disabled",
-                                None: "Defaulted",
-                            }
-
-                            after_key = (
-                                after_keys.replace("_", " ")
-                                .replace("guild", "server")
-                                .title()
-                            )
-
-                            if not role.count(f"<@&{before_role}>"):
-                                if before_role == before.guild.default_role.id:
-                                    if not role.count("@everyone"):
-                                        role.append("@everyone")
-
-                                else:
-                                    role.append(f"<@&{before_role}>")
+            def mention(target: int) -> str:
+                if target == before.guild.default_role.id:
+                    return "@everyone"
 
-                            if permission[after_value] == "Enabled":
-                                enabled.append(after_key)
+                return f"<@{target}>" if target in members else f"<@&{target}>"
 
-                            elif permission[after_value] == "Disabled":
-                                disabled.append(after_key)
+            role = []
+            added = []
+            removed = []
+            enabled = disabled = defaulted = 0
+
+            for target in before_overwrites.keys() | after_overwrites.keys():
+                before_allow, before_deny = before_overwrites.get(target, (0, 0))
+                after_allow, after_deny = after_overwrites.get(target, (0, 0))
+                changed = (before_allow ^ after_allow) | (before_deny ^ after_deny)
+                if target not in after_overwrites:
+                    removed.append(mention(target))
+                elif target not in before_overwrites:
+                    added.append(mention(target))
+                elif not changed:
+                    continue
+
+                role.append(mention(target))
+                enabled |= changed & after_allow
+                disabled |= changed & after_deny
+                defaulted |= changed & ~(after_allow | after_deny)
 
-                            elif permission[after_value] == "Defaulted":
-                                defaulted.append(after_key)
+            if role:
+                results = []
+                if added:
+                    results.append(f"Special permissions added for {', '.join(added)}")
 
-            if enabled or defaulted or disabled:
-                enables = "Enabled: " + ", ".join(enabled) + "\n"
-                disables = "Disabled: " + ", ".join(disabled) + "\n"
-                defaults = "Defaulted: " + ", ".join(defaulted) + "\n"
+                if removed:
+                    results.append(
+                        f"Special permissions removed for {', '.join(removed)}"
+                    )
 
-                results = f"{enables if enabled else ''}\
-                            {disables if disabled else ''}\
-                            {defaults if defaulted else ''}"
+                for label, bits in (
+                    ("Enabled", enabled),
+                    ("Disabled", disabled),
+                    ("Defaulted", defaulted),
+                ):
+                    if bits:
+                        results.append(f"{label}: {', '.join(permission_names(bits))}")
 
+                results = "\n".join(results)
                 changes = (
                     f"Permission(s) updated for ({len(role)}) role(s):\n\n{results}"
                 )
@@ -405,15 +1125,7 @@ class Events(commands.Cog):
                 )
 
             if changes:
-                if self.embeds.get(before.guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[before.guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[before.guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[before.guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(before.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_channel_pins_update(
@@ -424,7 +1136,7 @@ class Events(commands.Cog):
         """
         An event called when a message was pinned/unpinned.
         """
-        log_channel = await self.log_channel(channel.guild.id)
+        log_channel = await self.log_channel(channel.guild.id, "channels")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -435,22 +1147,14 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{channel.guild}", icon_url=channel.guild.icon.url)
 
-            if self.embeds.get(channel.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[channel.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[channel.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[channel.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(channel.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_thread_join(self, thread: discord.Thread) -> None:
         """
         An event called when a thread was created/joined.
         """
-        log_channel = await self.log_channel(thread.guild.id)
+        log_channel = await self.log_channel(thread.guild.id, "threads")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -468,22 +1172,14 @@ class Events(commands.Cog):
             embed.set_author(name=f"{thread.guild}", icon_url=thread.guild.icon.url)
 
             if changes:
-                if self.embeds.get(thread.guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[thread.guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[thread.guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[thread.guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(thread.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_thread_delete(self, thread: discord.Thread) -> None:
         """
         An event called when a thread was deleted.
         """
-        log_channel = await self.log_channel(thread.guild.id)
+        log_channel = await self.log_channel(thread.guild.id, "threads")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -492,15 +1188,7 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{thread.guild}", icon_url=thread.guild.icon.url)
 
-            if self.embeds.get(thread.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[thread.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[thread.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[thread.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(thread.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_thread_update(
@@ -509,7 +1197,7 @@ class Events(commands.Cog):
         """
         An event called when a thread has been updated.
         """
-        log_channel = await self.log_channel(before.guild.id)
+        log_channel = await self.log_channel(before.guild.id, "threads")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -531,54 +1219,28 @@ class Events(commands.Cog):
             embed.set_author(name=f"{before.guild}", icon_url=before.guild.icon.url)
 
             if changes:
-                if self.embeds.get(before.guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[before.guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[before.guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[before.guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(before.guild.id, webhook, embed)
 
     # Requires member intents
     async def on_member_parsing(
-        self, channel: discord.abc.GuildChannel, member: discord.Member, message: str
+        self,
+        channel: discord.abc.GuildChannel,
+        member: discord.Member,
+        event: str,
+        message: str,
     ) -> str:
         """
         |coro|
 
         Returns a formatted string for custom messages in `on_member_x` events.
+        The message is compiled once and recompiled only after it changes.
         """
-        return message.format(
-            user=member.mention,
-            user_id=member.id,
-            user_name=member.name,
-            user_discriminator=member.discriminator,
-            user_avatar=member.avatar.url,
-            server=member.guild.name,
-            server_id=member.guild.id,
-            server_icon=member.guild.icon.url,
-            server_owner_id=member.guild.owner.id,
-            server_owner=member.guild.owner.mention,
-            server_region=member.guild.region,
-            server_members=member.guild.member_count,
-            channel=channel.mention,
-            channel_name=channel.name,
-            channel_id=channel.id,
-            user_bot=member.bot,
-            server_verification=member.guild.verification_level,
-            server_joined_at=member.guild.me.joined_at.strftime("%b. %d, %Y"),
-            channel_type=channel.type[0],
-            user_position=sum(
-                user.joined_at < member.joined_at
-                for user in member.guild.members
-                if member.joined_at is not None
-            )
-            + 1,
-            server_created_at=member.guild.created_at.strftime("%b. %d"),
-            user_created_at=member.created_at.strftime("%b. %d"),
-        )
+        key = (member.guild.id, event)
+        template: Optional[Template] = self.templates.get(key)
+        if template is None or template.text != message:
+            template = self.templates[key] = Template.compile(message)
+
+        return template.render(self, channel, member)
 
     # Requires member intents
     async def member_channel(
@@ -592,34 +1254,32 @@ class Events(commands.Cog):
         A method that attempts to locate a :class:`discord.TextChannel` for `join` and
         `remove` events. If found, channel and message parsing will be completed.
         """
+        config = self.bot.guild_config.get(guild.id)
         if event == "join":
-            join: List = await self.bot.pool.fetch(
-                "SELECT joins, welcome FROM guilds WHERE guild = $1", guild.id
-            )
-            if join:
-                data: List = join[0]
-                channel: discord.TextChannel = guild.get_channel(data[7])
-                if channel:
-                    join_message = await self.on_member_parsing(
-                        channel, member, data[9]
-                    )
-                    return channel, join_message
+            channel: discord.TextChannel = guild.get_channel(config.joins)
+            if channel and config.welcome:
+                join_message = await self.on_member_parsing(
+                    channel, member, event, config.welcome
+                )
+                return channel, join_message
 
         elif event == "leave":
-            leave: List = await self.bot.pool.fetch(
-                "SELECT leave, goodbye FROM guilds WHERE guild = $1", guild.id
-            )
-            if leave:
-                data: List = leave[0]
-                channel: discord.TextChannel = guild.get_channel(data[8])
-                if channel:
-                    leave_message = await self.on_member_parsing(
-                        channel, member, data[10]
-                    )
-                    return channel, leave_message
+            channel: discord.TextChannel = guild.get_channel(config.leave)
+            if channel and config.goodbye:
+                leave_message = await self.on_member_parsing(
+                    channel, member, event, config.goodbye
+                )
+                return channel, leave_message
 
-        else:
-            return None
+        return None, None
+
+    @commands.Cog.listener("on_member_join")
+    async def index_member_join(self, member: discord.Member) -> None:
+        self.join_index.add(member)
+
+    @commands.Cog.listener("on_member_remove")
+    async def index_member_remove(self, member: discord.Member) -> None:
+        self.join_index.remove(member)
 
     # Deprecated due to changes in Discord API
     # @commands.Cog.listener()
@@ -627,7 +1287,7 @@ class Events(commands.Cog):
         """
         An event called whenever a member joins a server.
         """
-        log_channel = await self.log_channel(member.guild.id)
+        log_channel = await self.log_channel(member.guild.id, "members")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -638,25 +1298,20 @@ class Events(commands.Cog):
                 embed.set_thumbnail(url=member.avatar.url)
                 await channel.send(embed=embed)
 
+            if self.coalescer.hit(member.guild.id, "member_join", member.id):
+                return
+
             embed: discord.Embed = self.bot.embed(
                 description=f"{member} has joined {member.guild}", color=0x2ECC71
             )
             embed.set_author(name=str(member), icon_url=member.avatar.url)
 
-            if self.embeds.get(member.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[member.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[member.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[member.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(member.guild.id, webhook, embed)
 
     # Deprecated due to changes in Discord API
     # @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member) -> None:
-        log_channel = await self.log_channel(member.guild.id)
+        log_channel = await self.log_channel(member.guild.id, "members")
         if log_channel:
             webhook = await self.prepare_webhook(log_channel)
 
@@ -667,20 +1322,15 @@ class Events(commands.Cog):
                 embed.set_thumbnail(url=member.avatar.url)
                 await leave.send(embed=embed)
 
+            if self.coalescer.hit(member.guild.id, "member_remove", member.id):
+                return
+
             embed: discord.Embed = self.bot.embed(
                 description=f"{member} has left {member.guild}", color=0xE74C3C
             )
             embed.set_author(name=str(member), icon_url=member.avatar.url)
 
-            if self.embeds.get(member.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[member.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[member.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[member.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(member.guild.id, webhook, embed)
 
     # Requires member intents
     @commands.Cog.listener()
@@ -690,7 +1340,7 @@ class Events(commands.Cog):
         """
         An event called when member data has been updated.
         """
-        channel = await self.log_channel(before.guild.id)
+        channel = await self.log_channel(before.guild.id, "members")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -724,7 +1374,9 @@ class Events(commands.Cog):
                 if len(added) >= 1 or len(removed) >= 1:
                     changes += total
 
-            if changes == "":
+            if changes == "" or self.coalescer.hit(
+                before.guild.id, "member_update", before.id
+            ):
                 return
 
             embed: discord.Embed = self.bot.embed(
@@ -733,15 +1385,7 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{before}", icon_url=before.avatar.url)
 
-            if self.embeds.get(before.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[before.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[before.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[before.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(before.guild.id, webhook, embed)
 
     # Requires presence intents
     @commands.Cog.listener()
@@ -751,7 +1395,7 @@ class Events(commands.Cog):
         """
         An event called when a member's activity/presence has been updated.
         """
-        channel = await self.log_channel(before.guild.id)
+        channel = await self.log_channel(before.guild.id, "presences")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -822,15 +1466,7 @@ class Events(commands.Cog):
             )
             embed.set_author(name=f"{before}", icon_url=before.avatar.url)
 
-            if self.embeds.get(before.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[before.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[before.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[before.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(before.guild.id, webhook, embed)
 
     # Requires member intents
     @commands.Cog.listener()
@@ -838,49 +1474,33 @@ class Events(commands.Cog):
         """
         An event called when user data has been updated.
         """
-        if not before.bot:
-            guilds: List[discord.Guild] = self.bot.guilds
-            for guild in guilds:
-                channel = await self.log_channel(guild.id)
-                if channel:
-                    webhook = await self.prepare_webhook(channel)
-                    for member in guild.members:
-                        if member.id == before.id:
-
-                            changes = ""
-                            avatar = ""
-
-                            if before.avatar != after.avatar:
-                                changes += f"Avatar: [Old]({before.avatar.url}) -> [New]({after.avatar.url})"
-                                avatar += str(after.avatar.url)
-
-                            elif (
-                                before.name != after.name
-                                or before.discriminator != after.discriminator
-                            ):
-                                changes += f"Username: {before} -> {after}"
-
-                            if not changes:
-                                return
-
-                            embed: discord.Embed = self.bot.embed(
-                                description=f"{guild.get_member(before.id).mention} updated their account.\n\n{changes}",
-                                color=0xE67E22,
-                            )
-                            embed.set_thumbnail(url=avatar)
-
-                            if self.embeds.get(guild.id, None):
-                                embeds: List[discord.Embed] = self.embeds[guild.id][
-                                    "embeds"
-                                ].append(embed)
-
-                                self.embeds[guild.id].update(embed=embeds)
-                                return
-
-                            self.embeds[guild.id] = {
-                                "webhook": webhook,
-                                "embeds": [embed],
-                            }
+        if before.bot:
+            return
+
+        avatar = ""
+        if before.avatar != after.avatar:
+            changes = f"Avatar: [Old]({before.display_avatar.url}) -> [New]({after.display_avatar.url})"
+            avatar = str(after.display_avatar.url)
+
+        elif before.name != after.name or before.discriminator != after.discriminator:
+            changes = f"Username: {before} -> {after}"
+
+        else:
+            return
+
+        # Only the servers the user shares with the bot, each found by ID.
+        for guild in after.mutual_guilds:
+            channel = await self.log_channel(guild.id, "users")
+            if channel:
+                webhook = await self.prepare_webhook(channel)
+
+                embed: discord.Embed = self.bot.embed(
+                    description=f"{after.mention} updated their account.\n\n{changes}",
+                    color=0xE67E22,
+                )
+                embed.set_thumbnail(url=avatar)
+
+                self.queue_embeds(guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild) -> None:
@@ -903,6 +1523,10 @@ class Events(commands.Cog):
         """
         An event called when the bot leaves a server.
         """
+        self.join_index.joins.pop(guild.id, None)
+        self.templates.pop((guild.id, "join"), None)
+        self.templates.pop((guild.id, "leave"), None)
+
         if not hasattr(self, "owners"):
             self.owners: discord.User = [
                 await self.bot.fetch_user(owner) for owner in self.bot.owner_ids
@@ -921,7 +1545,7 @@ class Events(commands.Cog):
         """
         An event called when a server has been updated.
         """
-        channel = await self.log_channel(before.id)
+        channel = await self.log_channel(before.id, "server")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -952,22 +1576,14 @@ class Events(commands.Cog):
             embed.set_thumbnail(url=before.banner.url)
 
             if changes:
-                if self.embeds.get(before.id, None):
-                    embeds: List[discord.Embed] = self.embeds[before.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[before.id].update(embed=embeds)
-                    return
-
-                self.embeds[before.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(before.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: discord.Role) -> None:
         """
         An event called when a role has been created.
         """
-        channel = await self.log_channel(role.guild.id)
+        channel = await self.log_channel(role.guild.id, "roles")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -976,22 +1592,14 @@ class Events(commands.Cog):
             )
             embed.set_author(name=str(role.guild), icon_url=role.guild.icon.url)
 
-            if self.embeds.get(role.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[role.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[role.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[role.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(role.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: discord.Role) -> None:
         """
         An event called when a role has been deleted.
         """
-        channel = await self.log_channel(role.guild.id)
+        channel = await self.log_channel(role.guild.id, "roles")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1000,15 +1608,7 @@ class Events(commands.Cog):
             )
             embed.set_author(name=str(role.guild), icon_url=role.guild.icon.url)
 
-            if self.embeds.get(role.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[role.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[role.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[role.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(role.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_role_update(
@@ -1017,7 +1617,7 @@ class Events(commands.Cog):
         """
         An event called when a role has been updated.
         """
-        channel = await self.log_channel(before.guild.id)
+        channel = await self.log_channel(before.guild.id, "roles")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1031,35 +1631,11 @@ class Events(commands.Cog):
 
             elif before.permissions.value != after.permissions.value:
 
-                added = []
-                removed = []
                 total = "Permissions:\n\n"
 
-                for key, _ in dict(
-                    discord.Permissions(before.permissions.value)
-                ).items():
-                    if not key in [
-                        k
-                        for k, v in dict(
-                            discord.Permissions(after.permissions.value)
-                        ).items()
-                        if not v
-                    ]:
-                        removed.append(
-                            key.replace("_", " ").replace("guild", "server").title()
-                        )
-
-                for k, _ in dict(discord.Permissions(after.permissions.value)).items():
-                    if not k in [
-                        key
-                        for key, value in dict(
-                            discord.Permissions(before.permissions.value)
-                        ).items()
-                        if value
-                    ]:
-                        added.append(
-                            k.replace("_", " ").replace("guild", "server").title()
-                        )
+                changed = before.permissions.value ^ after.permissions.value
+                added = permission_names(changed & after.permissions.value)
+                removed = permission_names(changed & before.permissions.value)
 
                 if len(added) >= 1:
                     total += f"✅ Allowed Permission(s):\n{', '.join(added)}\n\n"
@@ -1078,15 +1654,7 @@ class Events(commands.Cog):
             embed.set_thumbnail(url=before.guild.banner.url)
 
             if changes:
-                if self.embeds.get(before.id, None):
-                    embeds: List[discord.Embed] = self.embeds[before.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[before.id].update(embed=embeds)
-                    return
-
-                self.embeds[before.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(before.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(
@@ -1096,7 +1664,7 @@ class Events(commands.Cog):
         An event called whenever a guild emoji has been updated.
         """
         if len(before) != len(after):
-            channel = await self.log_channel(guild.id)
+            channel = await self.log_channel(guild.id, "emojis")
             if channel:
                 webhook = await self.prepare_webhook(channel)
 
@@ -1106,15 +1674,7 @@ class Events(commands.Cog):
                 )
                 embed.set_author(name=str(guild), icon_url=guild.icon.url)
 
-                if self.embeds.get(guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(
@@ -1127,7 +1687,7 @@ class Events(commands.Cog):
         An event called whenever a guild sticker has been updated.
         """
         if len(before) != len(after):
-            channel = await self.log_channel(guild.id)
+            channel = await self.log_channel(guild.id, "emojis")
             if channel:
                 webhook = await self.prepare_webhook(channel)
 
@@ -1137,15 +1697,7 @@ class Events(commands.Cog):
                 )
                 embed.set_author(name=str(guild), icon_url=guild.icon.url)
 
-                if self.embeds.get(guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_voice_state_update(
@@ -1157,11 +1709,16 @@ class Events(commands.Cog):
         """
         An event called whenever a member joins/leaves a voice channel.
         """
-        channel = await self.log_channel(member.guild.id)
+        channel = await self.log_channel(member.guild.id, "voice")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
-            if before.channel != after.channel:
+            if before.channel != after.channel and not self.coalescer.hit(
+                member.guild.id,
+                "voice_state_update",
+                member.id,
+                (after.channel or before.channel).id,
+            ):
                 before_type = (
                     f"connected to {after.channel.type} channel ".replace("_", " ")
                     if after.channel
@@ -1179,22 +1736,14 @@ class Events(commands.Cog):
                     color=color,
                 )
 
-                if self.embeds.get(member.guild.id, None):
-                    embeds: List[discord.Embed] = self.embeds[member.guild.id][
-                        "embeds"
-                    ].append(embed)
-
-                    self.embeds[member.guild.id].update(embed=embeds)
-                    return
-
-                self.embeds[member.guild.id] = {"webhook": webhook, "embeds": [embed]}
+                self.queue_embeds(member.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_stage_instance_create(self, stage: discord.StageInstance) -> None:
         """
         An event called whenever a stage channel is created.
         """
-        channel = await self.log_channel(stage.guild.id)
+        channel = await self.log_channel(stage.guild.id, "stages")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1203,22 +1752,14 @@ class Events(commands.Cog):
                 color=0x2ECC71,
             )
 
-            if self.embeds.get(stage.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[stage.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[stage.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[stage.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(stage.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_stage_instance_delete(self, stage: discord.StageInstance) -> None:
         """
         An event called whenever a stage channel is deleted.
         """
-        channel = await self.log_channel(stage.guild.id)
+        channel = await self.log_channel(stage.guild.id, "stages")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1227,15 +1768,7 @@ class Events(commands.Cog):
                 color=0x2ECC71,
             )
 
-            if self.embeds.get(stage.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[stage.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[stage.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[stage.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(stage.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_stage_instance_create(
@@ -1244,7 +1777,7 @@ class Events(commands.Cog):
         """
         An event called whenever a stage channel is updated.
         """
-        channel = await self.log_channel(before.guild.id)
+        channel = await self.log_channel(before.guild.id, "stages")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1284,15 +1817,7 @@ class Events(commands.Cog):
                 color=0x2ECC71,
             )
 
-            if self.embeds.get(before.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[before.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[before.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[before.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(before.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_member_ban(
@@ -1301,30 +1826,22 @@ class Events(commands.Cog):
         """
         An event called whenever a member has been banned from a guild.
         """
-        channel = await self.log_channel(guild.id)
-        if channel:
+        channel = await self.log_channel(guild.id, "bans")
+        if channel and not self.coalescer.hit(guild.id, "member_ban", user.id):
             webhook = await self.prepare_webhook(channel)
 
             embed: discord.Embed = self.bot.embed(
                 description=f"{user} has been banned.", color=0xE74C3C
             )
 
-            if self.embeds.get(guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[guild.id]["embeds"].append(
-                    embed
-                )
-
-                self.embeds[guild.id].update(embed=embeds)
-                return
-
-            self.embeds[guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User) -> None:
         """
         An event called whenever a user has been unbanned from a guild.
         """
-        channel = await self.log_channel(guild.id)
+        channel = await self.log_channel(guild.id, "bans")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1332,23 +1849,20 @@ class Events(commands.Cog):
                 description=f"{user} has been unbanned.", color=0x2ECC71
             )
 
-            if self.embeds.get(guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[guild.id]["embeds"].append(
-                    embed
-                )
-
-                self.embeds[guild.id].update(embed=embeds)
-                return
-
-            self.embeds[guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_invite_create(self, invite: discord.Invite) -> None:
         """
         An event called whenever a channel invite has been created.
         """
-        channel = await self.log_channel(invite.guild.id)
-        if channel:
+        channel = await self.log_channel(invite.guild.id, "invites")
+        if channel and not self.coalescer.hit(
+            invite.guild.id,
+            "invite_create",
+            invite.inviter and invite.inviter.id,
+            invite.channel and invite.channel.id,
+        ):
             webhook = await self.prepare_webhook(channel)
 
             expire = []
@@ -1378,22 +1892,14 @@ class Events(commands.Cog):
                 color=0x2ECC71,
             )
 
-            if self.embeds.get(invite.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[invite.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[invite.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[invite.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(invite.guild.id, webhook, embed)
 
     @commands.Cog.listener()
     async def on_invite_delete(self, invite: discord.Invite) -> None:
         """
         An event called whenever a channel invite has been deleted.
         """
-        channel = await self.log_channel(invite.guild.id)
+        channel = await self.log_channel(invite.guild.id, "invites")
         if channel:
             webhook = await self.prepare_webhook(channel)
 
@@ -1402,15 +1908,7 @@ class Events(commands.Cog):
                 color=0xE74C3C,
             )
 
-            if self.embeds.get(invite.guild.id, None):
-                embeds: List[discord.Embed] = self.embeds[invite.guild.id][
-                    "embeds"
-                ].append(embed)
-
-                self.embeds[invite.guild.id].update(embed=embeds)
-                return
-
-            self.embeds[invite.guild.id] = {"webhook": webhook, "embeds": [embed]}
+            self.queue_embeds(invite.guild.id, webhook, embed)
 
 
 def setup(bot):
@@ -64,17 +64,8 @@ class Info(commands.Cog):
         """
         member = member or context.author
 
-        async def get_cached_user(_id: int) -> discord.User:
-            user: Optional[discord.User] = context.bot.cache["user"].get(_id)
-            if isinstance(user, discord.User):
-                return user
-
-            fetched_user: discord.User = await context.bot.fetch_user(_id)
-            context.bot.cache["user"].update({fetched_user.id: fetched_user})
-            return await get_cached_user(fetched_user.id)
-
-        user = await get_cached_user(member.id)
-        banner = user.banner
+        user: Optional[discord.User] = await context.bot.lookup.fetch_user(member.id)
+        banner = user.banner if user else None
         if banner is None:
             return await context.send(
                 f"{member} does not have a banner.", ephemeral=True
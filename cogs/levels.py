@@ -1,112 +1,245 @@
-import requests
+import asyncio
 import io
-import textwrap
 import math
+import time
+from typing import Optional
+
 import discord
-from discord.ext import commands
-from PIL import Image, ImageFont, ImageDraw, ImageFilter
+from discord.ext import commands, tasks
+from cache import LRUCache
 from main import Bot
+from rendering import RankCardSpec, render_rank_card
+
+
+class LevelTracker:
+    """
+    An in-memory accumulator of message counts and
+    levels per (guild, user) that records which
+    entries changed since the last flush.
+    -----------------------------
+
+    Entries are loaded as users send messages and
+    evicted once flushed and idle, so only recently
+    active users are kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self.levels: dict[tuple[int, int], list[int]] = {}
+        self.dirty: set[tuple[int, int]] = set()
+        # (Guild, user) -> monotonic time the entry was last used.
+        self.seen: dict[tuple[int, int], float] = {}
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        return key in self.levels
+
+    def load(self, records: list) -> None:
+        """
+        Fills the tracker from `levels` rows.
+        """
+        now = time.monotonic()
+        for guild, user_id, level, messages in records:
+            self.levels[guild, user_id] = [level, messages]
+            self.seen[guild, user_id] = now
+
+    def get(self, guild: int, user_id: int) -> Optional[tuple[int, int]]:
+        """
+        Returns the (level, messages) of a user, if any.
+        """
+        entry = self.levels.get((guild, user_id))
+        return tuple(entry) if entry else None
+
+    def add_message(self, guild: int, user_id: int) -> Optional[int]:
+        """
+        Counts a message and returns the level the user
+        was on if this message advanced them.
+        """
+        key = (guild, user_id)
+        self.dirty.add(key)
+        self.seen[key] = time.monotonic()
+
+        entry = self.levels.get(key)
+        if entry is None:
+            self.levels[key] = [1, 1]
+            return None
+
+        level, messages = entry
+        entry[1] = messages + 1
+        if messages == math.pow(level, 2):
+            entry[0] = level + 1
+            return level
+
+        return None
+
+    def pop_dirty(self) -> list[tuple[int, int, int, int]]:
+        """
+        Returns the rows changed since the last call
+        and clears the changed set.
+        """
+        dirty, self.dirty = self.dirty, set()
+        return [
+            (guild, user_id, *self.levels[guild, user_id]) for guild, user_id in dirty
+        ]
+
+    def evict(self, idle: float) -> int:
+        """
+        Forgets entries that were flushed and not used
+        for `idle` seconds and returns how many.
+        """
+        cutoff = time.monotonic() - idle
+        stale = [
+            key
+            for key, seen in self.seen.items()
+            if seen < cutoff and key not in self.dirty
+        ]
+        for key in stale:
+            del self.levels[key]
+            del self.seen[key]
+
+        return len(stale)
 
 
 class Levels(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.tracker = LevelTracker()
+        # (Guild, user) -> the running load of their `levels` row.
+        self.loading: dict[tuple[int, int], asyncio.Task] = {}
+        # Seconds an entry stays in memory after a user's last message.
+        self.idle = self.bot.config.getint("CACHE", "level_idle", fallback=600)
+
+        # Encoded cards keyed on everything visible on them.
+        self.cards = LRUCache(
+            1024,
+            maxbytes=self.bot.config.getint("RENDERING", "card_cache_mb", fallback=64)
+            * 1024
+            * 1024,
+        )
+
+        self.bot.loop.create_task(self.__ainit__())
+
+    async def __ainit__(self) -> None:
+        """
+        |coro|
+
+        An asynchronous version of :method:`__init__`
+        to access coroutines.
+        """
+        await self.bot.wait_until_ready()
+
+        self.flush_levels.start()
+
+    def cog_unload(self) -> None:
+        """
+        This method is called before the extension is unloaded
+        to allow for the running task loop to gracefully
+        close after finishing final iteration.
+        """
+        self.flush_levels.stop()
+        return super().cog_unload()
+
+    async def load_level(self, guild: int, user_id: int) -> None:
+        """
+        |coro|
+
+        Loads a user's `levels` row into the tracker if it is
+        not there yet, sharing one query between concurrent calls.
+        """
+        key = (guild, user_id)
+        if key in self.tracker:
+            return
+
+        task = self.loading.get(key)
+        if task is None:
+            task = self.loading[key] = self.bot.loop.create_task(
+                self.fetch_level(guild, user_id)
+            )
+
+        await asyncio.shield(task)
+
+    async def fetch_level(self, guild: int, user_id: int) -> None:
+        try:
+            record = await self.bot.pool.fetchrow(
+                "SELECT guild, user_id, level, messages FROM public.levels "
+                "WHERE guild = $1 AND user_id = $2",
+                guild,
+                user_id,
+            )
+            # Not overwriting messages counted since an earlier load.
+            if record and (guild, user_id) not in self.tracker:
+                self.tracker.load([record])
+        finally:
+            del self.loading[guild, user_id]
+
+    async def flush(self) -> None:
+        """
+        |coro|
+
+        Writes every level changed since the last flush in a
+        single batch, then evicts entries that went idle.
+        """
+        rows = self.tracker.pop_dirty()
+        if rows:
+            try:
+                await self.bot.pool.executemany(
+                    "INSERT INTO public.levels (guild, user_id, level, messages) VALUES ($1, $2, $3, $4) "
+                    "ON CONFLICT (guild, user_id) DO UPDATE SET level = EXCLUDED.level, messages = EXCLUDED.messages",
+                    rows,
+                )
+            except Exception as error:
+                # Retried on the next flush rather than stopping the loop.
+                self.tracker.dirty.update(
+                    (guild, user_id) for guild, user_id, *_ in rows
+                )
+                print("Failed to flush levels:", error)
+
+        self.tracker.evict(self.idle)
+
+    @tasks.loop(seconds=5, reconnect=True)
+    async def flush_levels(self) -> None:
+        """
+        |coro|
+
+        A running task loop that flushes changed
+        levels every iteration.
+        """
+        await self.flush()
+
+    @flush_levels.after_loop
+    async def after_flush_levels(self) -> None:
+        await self.flush()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if not message.author.bot:
-            user = await self.bot.pool.fetchrow(
-                "SELECT * FROM public.levels WHERE guild=$1 AND user_id=$2",
-                message.guild.id,
-                message.author.id,
-            )
-            if user == None:
-                await self.bot.pool.execute(
-                    "INSERT INTO public.levels (guild, user_id, level, messages) VALUES ($1, $2, $3, $4) ON CONFLICT DO NOTHING",
-                    message.guild.id,
-                    message.author.id,
-                    1,
-                    1,
+        if message.guild and not message.author.bot:
+            await self.load_level(message.guild.id, message.author.id)
+            level = self.tracker.add_message(message.guild.id, message.author.id)
+            if level is not None:
+                await message.reply(
+                    f"GG {message.author.mention}, you just advanced to level {level}"
                 )
-            else:
-                if user[3] == math.pow(user[2], 2):
-                    await self.bot.pool.execute(
-                        "INSERT INTO public.levels (guild, user_id, level, messages) VALUES ($1, $2, $3, $4) ON CONFLICT (guild, user_id) DO UPDATE SET level=$3, messages=$4",
-                        message.guild.id,
-                        message.author.id,
-                        user[2] + 1,
-                        user[3] + 1,
-                    )
-                    await message.reply(f'GG {message.author.mention}, you just advanced to level {user[2]}')
-                else:
-                    await self.bot.pool.execute(
-                        "INSERT INTO public.levels (guild, user_id, level, messages) VALUES ($1, $2, $3, $4) ON CONFLICT (guild, user_id) DO UPDATE SET messages=$4",
-                        message.guild.id,
-                        message.author.id,
-                        user[2],
-                        user[3] + 1,
-                    )
 
     @commands.Command
     async def level(self, context: commands.Context):
-        user = await self.bot.pool.fetchrow(
-            "SELECT * FROM public.levels WHERE guild=$1 AND user_id=$2",
-            context.guild.id,
-            context.author.id,
-        )
-        image = Image.open("gradientBig.jpg")
-        image = image.resize((1920, 1080))
-        image = image.filter(ImageFilter.GaussianBlur(radius=10))
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.truetype("Ubuntu-Medium.ttf", 92)
-        margin = offset = image.width / 4
-        for line in textwrap.wrap(context.author.display_name, width=40):
-            draw.text((margin, offset), line, font=font, fill=(255, 255, 255))
-            offset += font.getsize(line)[1]
-
-        draw.text(
-            ((image.width / 4) * 3, offset),
-            f"Level {user[2]}",
-            font=font,
-            fill=(255, 255, 255),
-            align="right",
-        )
-        draw.text(
-            ((image.height / 10) * 1, (image.width / 10) * 1),
-            context.guild.name,
-            font=font,
-            fill=(255, 255, 255),
-            align="left",
-        )
-        # draw.rounded_rectangle(
-        #     (
-        #         (image.width / 5, image.height / 5 * 4),
-        #         (image.width / 5 * 4, (image.height / 5 * 4) - 100),
-        #     ),
-        #     fill=(255, 255, 255),
-        #     radius=100,
-        # )
-        draw.rounded_rectangle(
-            (
-                (image.width / 5, image.height / 5 * 4),
-                (
-                    (image.width / 5 * 4 / ((math.pow(user[2], 2) / user[3]))),
-                    image.height / 5 * 4 - 100,
-                ),
-            ),
-            fill=(0, 0, 0),
-            width=5,
-            radius=1,
-            outline="black"
-        )
+        await self.load_level(context.guild.id, context.author.id)
+        user = self.tracker.get(context.guild.id, context.author.id)
+        if user is None:
+            await context.reply("You have not sent any messages yet.")
+            return
 
-        imageOut = io.BytesIO()
-        image.save(
-            imageOut,
-            "png",
+        level, messages = user
+        spec = RankCardSpec.create(
+            display_name=context.author.display_name,
+            guild_name=context.guild.name,
+            level=level,
+            messages=messages,
         )
-        imageOut.seek(0)
-        await context.reply(file=discord.File(fp=imageOut, filename="card.png"))
+        card: Optional[bytes] = self.cards.get(spec)
+        if card is None:
+            card = self.cards[spec] = await self.bot.renderer.render(
+                render_rank_card, spec
+            )
+
+        await context.reply(file=discord.File(fp=io.BytesIO(card), filename="card.png"))
 
 
 def setup(bot: Bot):
@@ -1,4 +1,7 @@
+import asyncio
+import contextlib
 import datetime
+import heapq
 from datetime import timedelta
 from typing import Any, Optional
 
@@ -25,6 +28,13 @@ class Moderation(commands.Cog):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+
+        self.muted: dict[int, dict[int, Optional[datetime.datetime]]] = {}
+        # A min-heap of (ends, guild, member). Entries whose mute was since
+        # removed or replaced are left in place and skipped once popped.
+        self.deadlines: list[tuple[datetime.datetime, int, int]] = []
+        self.wakeup = asyncio.Event()
+
         self.bot.loop.create_task(self.__ainit__())
 
     async def __ainit__(self) -> None:
@@ -35,20 +45,17 @@ class Moderation(commands.Cog):
         to access coroutines.
         """
         await self.bot.wait_until_ready()
+        # Unmuting needs each server's muted role.
+        await self.bot.guild_config.wait_loaded()
 
-        self.bot.mute_role: dict[int, int] = {  # type: ignore
-            guild: role
-            for guild, role in await self.bot.pool.fetch(
-                "SELECT guild, mute FROM guilds"
-            )
-        }
+        for guild, member, ends in await self.bot.pool.fetch(
+            "SELECT guild, muted, ends FROM mutes"
+        ):
+            self.muted.setdefault(guild, {})[member] = ends
+            if ends is not None:
+                self.deadlines.append((ends, guild, member))
 
-        self.muted: dict[int, dict[int, datetime.datetime]] = {
-            guild: {member: duration}
-            for guild, member, duration in await self.bot.pool.fetch(
-                "SELECT guild, muted, ends FROM mutes"
-            )
-        }
+        heapq.heapify(self.deadlines)
 
         await self.check_mutes.start()
 
@@ -59,52 +66,97 @@ class Moderation(commands.Cog):
         close after finishing final iteration.
         """
         self.check_mutes.stop()
+        self.wakeup.set()
         return super().cog_unload()
 
-    @tasks.loop(seconds=10, reconnect=True)
+    def schedule_unmute(
+        self, guild: int, member: int, ends: Optional[datetime.datetime]
+    ) -> None:
+        """
+        Records a mute and, if it ends, wakes :method:`check_mutes`
+        when its end is sooner than every other.
+        """
+        self.muted.setdefault(guild, {})[member] = ends
+        if ends is None:
+            return
+
+        heapq.heappush(self.deadlines, (ends, guild, member))
+        if self.deadlines[0][0] == ends:
+            self.wakeup.set()
+
+    @tasks.loop(seconds=0, reconnect=True)
     async def check_mutes(self) -> None:
         """
         |coro|
 
-        A running task loop that repeats after each iteration
-        asynchronously to to check if a user's mute duration
-        has been met and can be unmuted.
+        A running task loop that sleeps until the soonest mute
+        ends, or a sooner one is added, and then unmutes every
+        member whose mute has ended.
         """
-        muted = self.muted.copy()
-        for guilds in iter(muted):
+        self.wakeup.clear()
+        delay = None
+        if self.deadlines:
+            delay = (self.deadlines[0][0] - discord.utils.utcnow()).total_seconds()
 
-            muted_guild = self.muted[guilds].copy()
-            for key, value in muted_guild.items():
-                if value is None:
-                    continue
+        if delay is None or delay > 0:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), delay)
+
+        now = discord.utils.utcnow()
+        ended = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            ends, guild, member = heapq.heappop(self.deadlines)
+            if self.muted.get(guild, {}).get(member) == ends:
+                del self.muted[guild][member]
+                ended.append((guild, member))
+
+        if ended:
+            await self.unmute(ended)
+
+    async def unmute(self, ended: list[tuple[int, int]]) -> None:
+        """
+        |coro|
+
+        Deletes the ended mutes in a single query and
+        removes the muted role from each member.
+        """
+        try:
+            await self.bot.pool.executemany(
+                "DELETE FROM mutes WHERE guild = $1 AND muted = $2", ended
+            )
+        except Exception as error:
+            # Left in the table, so they are unmuted again on the next start.
+            print("Failed to delete ended mutes:", error)
+
+        await asyncio.gather(
+            *(self.remove_mute_role(guild, member) for guild, member in ended)
+        )
+
+    async def remove_mute_role(self, guild_id: int, member_id: int) -> None:
+        """
+        |coro|
 
-                current_time = discord.utils.utcnow()
-                if current_time >= value:
-                    try:
-
-                        guild: discord.Guild = self.bot.get_guild(guilds)
-                        role: discord.Role = guild.get_role(
-                            self.bot.mute_role.get(guild.id)
-                        )
-                        member: discord.Member = self.bot.cache["member"].get(
-                            key, None
-                        ) or await guild.fetch_member(key)
-
-                        await self.bot.pool.execute(
-                            "DELETE FROM mutes WHERE guild = $1 AND muted = $2",
-                            guild.id,
-                            key,
-                        )
-
-                        if member and role:
-                            try:
-                                await member.remove_roles(role)
-                            except (discord.Forbidden, discord.HTTPException):
-                                pass
-
-                        del self.muted[guilds][key]
-                    except (discord.Forbidden, discord.HTTPException, discord.NotFound):
-                        del self.muted[guilds][key]
+        Removes a server's muted role from a member,
+        if both the member and role still exist.
+        """
+        guild: Optional[discord.Guild] = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+
+        role: Optional[discord.Role] = guild.get_role(
+            self.bot.guild_config.get(guild.id).mute
+        )
+        if not role:
+            return
+
+        try:
+            member: Optional[discord.Member] = await self.bot.lookup.fetch_member(
+                guild, member_id
+            )
+            if member:
+                await member.remove_roles(role)
+        except (discord.Forbidden, discord.HTTPException):
+            pass
 
     @check_mutes.before_loop
     async def before_check_mutes(self) -> None:
@@ -541,7 +593,9 @@ class Moderation(commands.Cog):
         """
         Allows mods/admins/owners to mute a user.
         """
-        muted_role_id: Optional[int] = self.bot.mute_role.get(context.guild.id)
+        muted_role_id: Optional[int] = self.bot.guild_config.get(
+            context.guild.id
+        ).mute
         role: discord.Role = context.guild.get_role(muted_role_id)
         if not role:
             await context.send(
@@ -564,11 +618,7 @@ class Moderation(commands.Cog):
             readable_date = discord.utils.format_dt(mute_duration)
             readable_time = discord.utils.format_dt(mute_duration, "R")
 
-        if guild_mutes:
-            self.muted[context.guild.id].update({member.id: mute_duration})
-
-        else:
-            self.muted[context.guild.id] = {member.id: mute_duration}
+        self.schedule_unmute(context.guild.id, member.id, mute_duration)
 
         await context.bot.pool.execute(
             "INSERT INTO mutes VALUES ($1, $2, $3, $4, $5)",
@@ -603,11 +653,10 @@ class Moderation(commands.Cog):
         """
         Allows mods/admins/owners to unmute a user.
         """
-        muted = self.muted.get(context.guild.id).copy()
-        if member.id in muted.keys():
+        if member.id in self.muted.get(context.guild.id, {}):
 
             role: discord.Role = context.guild.get_role(
-                self.bot.mute_role.get(context.guild.id)
+                self.bot.guild_config.get(context.guild.id).mute
             )
 
             if role in member.roles:
@@ -1,15 +1,60 @@
-import requests
+import asyncio
 import io
-import textwrap
+import json
+from urllib.parse import urlencode
+
+import aiohttp
 import discord
-from discord.ext import commands
-from PIL import Image, ImageFont, ImageDraw, ImageFilter
+from discord.ext import commands, tasks
 from main import Bot
+from rendering import QuoteSpec, RenderError, render_quote
+
+QUOTE_URL = "https://quotable.io/random"
+UNSPLASH_URL = "https://api.unsplash.com/photos/random?query=nature&orientation=landscape"
+
+TIMEOUT = aiohttp.ClientTimeout(total=10, sock_connect=5)
+IMAGE_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=10)
+MAX_JSON_BYTES = 64 * 1024
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+
+# Asks Unsplash for a JPEG cropped to the size it is rendered at.
+IMAGE_SIZE = urlencode({"w": 1920, "h": 1080, "fit": "crop", "fm": "jpg", "q": 85})
+
+
+class ResponseTooLarge(Exception):
+    def __init__(self, url: str) -> None:
+        super().__init__(f"Response from {url} exceeded the size limit.")
+
+
+QUOTE_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    ResponseTooLarge,
+    RenderError,
+    KeyError,
+    ValueError,
+)
+
 
 class Quotes(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
 
+        # Rendered quotes waiting to be sent, refilled in the background.
+        size = self.bot.config.getint("QUOTES", "prefetch", fallback=3)
+        self.ready: asyncio.Queue[tuple[str, bytes]] = asyncio.Queue(max(size, 1))
+        if size > 0:
+            self.prefetch_quotes.start()
+
+    def cog_unload(self) -> None:
+        """
+        This method is called before the extension is unloaded
+        to cancel the running task loop, which may be waiting
+        on a full queue.
+        """
+        self.prefetch_quotes.cancel()
+        return super().cog_unload()
+
     def get_dominant_color(self, pil_img):
         img = pil_img.copy()
         img.convert("RGB")
@@ -30,30 +75,106 @@ class Quotes(commands.Cog):
 
         
     
+    async def fetch(
+        self,
+        url: str,
+        limit: int,
+        timeout: aiohttp.ClientTimeout = TIMEOUT,
+        **kwargs,
+    ) -> bytes:
+        """
+        |coro|
+
+        Returns the body of a GET request, giving up once it
+        takes longer than `timeout` or grows past `limit` bytes.
+        """
+        async with self.bot.cs.get(url, timeout=timeout, **kwargs) as response:
+            response.raise_for_status()
+            if (response.content_length or 0) > limit:
+                raise ResponseTooLarge(url)
+
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(65536):
+                body.extend(chunk)
+                if len(body) > limit:
+                    raise ResponseTooLarge(url)
+
+            return bytes(body)
+
+    async def fetch_json(self, url: str, **kwargs) -> dict:
+        """
+        |coro|
+
+        Returns the decoded JSON body of a GET request.
+        """
+        return json.loads(await self.fetch(url, MAX_JSON_BYTES, **kwargs))
+
+    async def make_quote(self) -> tuple[str, bytes]:
+        """
+        |coro|
+
+        Fetches a random quote and background and returns
+        the quote text with the rendered JPEG image.
+        """
+        quote, image_data = await asyncio.gather(
+            self.fetch_json(QUOTE_URL),
+            self.fetch_json(
+                UNSPLASH_URL,
+                headers={
+                    "Authorization": f'Client-ID {self.bot.config["SECRET"]["unsplash"]}'
+                },
+            ),
+        )
+        url: str = image_data["urls"]["raw"]
+        raw_image = await self.fetch(
+            f"{url}{'&' if '?' in url else '?'}{IMAGE_SIZE}",
+            MAX_IMAGE_BYTES,
+            IMAGE_TIMEOUT,
+        )
+
+        content: str = quote["content"]
+        image = await self.bot.renderer.render(
+            render_quote,
+            QuoteSpec(content=content, author=quote["author"], image=raw_image),
+        )
+        return content, image
+
+    @tasks.loop(seconds=1, reconnect=True)
+    async def prefetch_quotes(self) -> None:
+        """
+        |coro|
+
+        A running task loop that keeps the queue of ready
+        quote images full, waiting while it is.
+        """
+        try:
+            quote = await self.make_quote()
+        except QUOTE_ERRORS:
+            await asyncio.sleep(30)
+            return
+
+        await self.ready.put(quote)
+
+    @prefetch_quotes.before_loop
+    async def before_prefetch_quotes(self) -> None:
+        await self.bot.wait_until_ready()
+
     @commands.Command
     async def quote(self, context: commands.Context):
         await context.defer()
-        quote = requests.get('https://quotable.io/random')
-        imageData = requests.get('https://api.unsplash.com/photos/random?query=nature&orientation=landscape', headers={
-            'Authorization': f'Client-ID {self.bot.config["SECRET"]["unsplash"]}'
-        })
-        rawImage = requests.get(imageData.json()["urls"]["raw"]).content
-        image = Image.open(io.BytesIO(rawImage))
-        image.resize((1920,1080),Image.ANTIALIAS)
-        image = image.filter(ImageFilter.GaussianBlur(radius=10))
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.truetype("Ubuntu-Light.ttf", 100)
-        margin = offset = image.width/4
-        for line in textwrap.wrap(quote.json()['content'], width=40):
-            draw.text((margin, offset), line, font=font, fill=(255, 255, 255))
-            offset += font.getsize(line)[1]
-
-        # Write the quote author
-        font = ImageFont.truetype("Ubuntu-Light.ttf", 64)
-        draw.text(((image.width/4)*3,offset), quote.json()['author'], font=font, fill=(255, 255, 255), align="right")
-        image.save(f'{(quote.json()["content"][:75] + "..") if len(quote.json()["content"]) > 75 else quote.json()["content"]}.jpg', quality=75)
-        await context.send(file=discord.File(f'{(quote.json()["content"][:75] + "..") if len(quote.json()["content"]) > 75 else quote.json()["content"]}.jpg'))
-        
+        try:
+            _, image = self.ready.get_nowait()
+        except asyncio.QueueEmpty:
+            try:
+                _, image = await self.make_quote()
+            except QUOTE_ERRORS:
+                await context.send(
+                    "Could not fetch a quote right now, try again later.",
+                    ephemeral=True,
+                )
+                return
+
+        await context.send(file=discord.File(io.BytesIO(image), filename="quote.jpg"))
 
     
 def setup(bot: Bot):
@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from cache import LOG_EVENTS, log_events_mask
 from main import Bot
 
 from cogs.errors import guild_owner, is_admin
@@ -29,9 +30,7 @@ class Settings(commands.Cog):
         """
         Update the guild's admin role.
         """
-        await context.bot.pool.execute(
-            "UPDATE guilds SET admins = $1 WHERE guild = $2", role.id, context.guild.id
-        )
+        await context.bot.guild_config.update(context.guild.id, admins=role.id)
         await context.send(
             f"{role.mention} has been set as the admin role and will be able to use all moderation commands.",
             ephemeral=True,
@@ -49,9 +48,7 @@ class Settings(commands.Cog):
         """
         Update the guild's mod role.
         """
-        await context.bot.pool.execute(
-            "UPDATE guilds SET mods = $1 WHERE guild = $2", role.id, context.guild.id
-        )
+        await context.bot.guild_config.update(context.guild.id, mods=role.id)
         await context.send(
             f"{role.mention} has been set as the mod role and will be able to use most moderation commands.",
             ephemeral=True,
@@ -69,12 +66,7 @@ class Settings(commands.Cog):
         """
         Update the guild's muted role.
         """
-        await context.bot.pool.execute(
-            "UPDATE guilds SET mute = $1 WHERE guild = $2",
-            role.id,
-            context.guild.id,
-        )
-        context.bot.mute_role.update({context.guild.id: role.id})
+        await context.bot.guild_config.update(context.guild.id, mute=role.id)
         await context.send(
             f"{role.mention} has been set as the muted role.", ephemeral=True
         )
@@ -87,16 +79,32 @@ class Settings(commands.Cog):
         channel: discord.TextChannel = commands.Option(
             None, description="Designated channel to log server events."
         ),
+        events: str = commands.Option(
+            None,
+            description="Event types to log, e.g. messages roles bans, or all.",
+        ),
     ):
         """
-        Update the guild's logging channel.
+        Update the guild's logging channel and the types of events logged.
         """
         channel: discord.TextChannel = channel or context.channel
-        await context.bot.pool.execute(
-            "UPDATE guilds SET logs = $1 WHERE guild = $2",
-            channel.id,
-            context.guild.id,
-        )
+        settings = {"logs": channel.id}
+        if channel.id != context.bot.guild_config.get(context.guild.id).logs:
+            # The saved webhook belongs to the previous log channel.
+            settings["log_webhook"] = None
+
+        if events:
+            try:
+                names = events.replace(",", " ").split()
+                settings["log_events"] = log_events_mask(names)
+            except ValueError as error:
+                await context.send(
+                    f"{error}. Event types: {', '.join(LOG_EVENTS)} or all.",
+                    ephemeral=True,
+                )
+                return
+
+        await context.bot.guild_config.update(context.guild.id, **settings)
         await context.send(
             f"Events will now be logged in {channel.mention}", ephemeral=True
         )
@@ -118,10 +126,8 @@ class Settings(commands.Cog):
         """
         Set channel where Twitch now live notifications are sent to.
         """
-        await context.bot.pool.execute(
-            "UPDATE guilds SET twitch_channel = $1 WHERE guild = $2",
-            channel.id,
-            context.guild.id,
+        await context.bot.guild_config.update(
+            context.guild.id, twitch_channel=channel.id
         )
         await context.send(
             f"Twitch live notifications will now be sent to {channel.mention}",
@@ -145,10 +151,8 @@ class Settings(commands.Cog):
         """
         Update which category channel tickets are created in.
         """
-        await context.bot.pool.execute(
-            "UPDATE guilds SET ticket_category = $1 WHERE guild = $2",
-            category.id if category else 0,
-            context.guild.id,
+        await context.bot.guild_config.update(
+            context.guild.id, ticket_category=category.id if category else 0
         )
         await context.send(
             f"Tickets will now be created in the {category.name}"
@@ -171,11 +175,7 @@ class Settings(commands.Cog):
         Decide if/what message is sent on ticket creation.
         """
         message = message[:2000]
-        await context.bot.pool.execute(
-            "UPDATE guilds SET ticket_message = $1 WHERE guild = $2",
-            message,
-            context.guild.id,
-        )
+        await context.bot.guild_config.update(context.guild.id, ticket_message=message)
         await context.send(
             f"Message sent on ticket creation has been set to\n\n{message}"
             if message
@@ -123,18 +123,14 @@ class Tickets(commands.Cog):
             )
             return
 
-        category_id: int = await self.bot.pool.fetchval(
-            "SELECT ticket_category FROM guilds WHERE guild = $1", context.guild.id
-        )
-        ticket_message: str = await self.bot.pool.fetchval(
-            "SELECT ticket_message FROM guilds WHERE guild = $1", context.guild.id
-        )
-        category = context.guild.get_channel(category_id)
+        config = self.bot.guild_config.get(context.guild.id)
+        ticket_message: str = config.ticket_message
+        category = context.guild.get_channel(config.ticket_category)
         role_overwrites = {
             role: discord.PermissionOverwrite(read_messages=False)
             for role in context.guild.roles
-            if role.id != self.bot.admins.get("admin", 0)
-            or role.id != self.bot.admins.get("mod", 0)
+            if role.id != (config.admins or 0)
+            or role.id != (config.mods or 0)
             or not any(
                 role.permissions.manage_messages,
                 role.permissions.administrator,
@@ -192,10 +188,8 @@ class Tickets(commands.Cog):
                 overwrites=overwrites,
                 reason="Automatic ticket category creation.",
             )
-            await context.bot.pool.execute(
-                "UPDATE guilds SET ticket_category = $1 WHERE guild = $2",
-                category.id,
-                context.guild.id,
+            await context.bot.guild_config.update(
+                context.guild.id, ticket_category=category.id
             )
 
             channel = await category.create_text_channel(
@@ -13,7 +13,9 @@ from discord.ext import commands
 
 import webcomms
 
+from cache import GuildConfigStore, LRUCache, UserLookup
 from postgre import Database
+from rendering import Renderer
 
 
 class Bot(commands.Bot):
@@ -48,6 +50,15 @@ class Bot(commands.Bot):
         opened on initialization to allow for
         continued use without having to open and
         close connections.
+
+    renderer: :class:`Renderer`
+        A pool of worker processes that
+        render images off the event loop.
+
+    guild_config: :class:`GuildConfigStore`
+        An in-memory copy of the `guilds` table
+        loaded once in :method:`create_caches`
+        and updated in place on changes.
     """
 
     def __init__(self) -> None:
@@ -76,6 +87,7 @@ class Bot(commands.Bot):
         self._BotBase__cogs = commands.core._CaseInsensitiveDict()
         self.loop = asyncio.get_event_loop()
         self.pool = Database(self.loop).pool
+        self.guild_config = GuildConfigStore(self.pool)
 
         self.loop.create_task(self.__ainit__())
 
@@ -114,6 +126,12 @@ class Bot(commands.Bot):
         called when gracefully closing
         connection with Discord.
         """
+        self.renderer.close()
+        # Writes the levels counted since the last flush while the pool is open.
+        levels = self.get_cog("Levels")
+        if levels:
+            await levels.flush()
+
         await asyncio.wait_for(self.cs.close(), 30)
         await asyncio.wait_for(self.pool.close(), 30)
         await super().close()
@@ -146,6 +164,11 @@ class Bot(commands.Bot):
         self.uptime = discord.utils.utcnow()
         self.embed = discord.Embed
         self.cs = aiohttp.ClientSession()
+        self.renderer = Renderer(
+            workers=self.config.getint("RENDERING", "workers", fallback=2),
+            max_pending=self.config.getint("RENDERING", "max_pending", fallback=16),
+            timeout=self.config.getfloat("RENDERING", "timeout", fallback=30),
+        )
 
     async def on_ready(self) -> None:
         """
@@ -186,12 +209,12 @@ class Bot(commands.Bot):
         or defaults to default prefix.
         """
 
-        if message.guild and hasattr(self, "prefix"):
-            if not self.prefix.get(message.guild.id, None):
-                await self.add_prefix(message.guild.id)
+        if message.guild and self.guild_config.loaded:
+            prefix: Optional[str] = self.guild_config.get(message.guild.id).prefix
+            if not prefix:
+                prefix = await self.add_prefix(message.guild.id)
 
             if isinstance(message, discord.Message):
-                prefix: str = self.prefix.get(message.guild.id)
                 return (
                     commands.when_mentioned_or(prefix)(self, message)
                     or self.user.mention
@@ -210,14 +233,7 @@ class Bot(commands.Bot):
                 self.cache["member"].update({message.author.id: message.author})
 
                 if self.user.mentioned_in(message):
-                    self.cache["member"].update({message.author.id: message.author})
-                    if not self.cache["user"].get(message.author.id):
-                        context: commands.Context = await self.get_context(message)
-                        user: Optional[discord.User] = await context.bot.fetch_user(
-                            message.author.id
-                        )
-                        if isinstance(user, discord.User):
-                            self.cache["user"].update({user.id: user})
+                    await self.lookup.fetch_user(message.author.id)
 
             try:
                 await self.process_commands(message)
@@ -237,13 +253,7 @@ class Bot(commands.Bot):
         been invoked successfully.
         """
         self.cache["member"].update({context.author.id: context.author})
-        if not self.cache["user"].get(context.author.id):
-            user: Optional[discord.User] = await context.bot.fetch_user(
-                context.author.id
-            )
-            if isinstance(user, discord.User):
-                self.cache["user"].update({user.id: user})
-        
+        await self.lookup.fetch_user(context.author.id)
 
 
     async def add_prefix(self, guild_id: int) -> str:
@@ -259,7 +269,7 @@ class Bot(commands.Bot):
             self.user.mention,
         )
 
-        self.prefix.update({guild_id: self.user.mention})
+        self.guild_config.apply(guild_id, prefix=self.user.mention)
         return self.user.mention
 
     async def create_caches(self):
@@ -270,23 +280,22 @@ class Bot(commands.Bot):
         will assign instance attributes that specifically build
         the local cache after accessing the database.
         """
-        self.cache: dict[str, dict[int, Union[discord.Member, discord.User]]] = {"member": {}, "user": {}}  # type: ignore
+        ttl: float = self.config.getfloat("CACHE", "ttl", fallback=3600)
+        self.cache: dict[str, LRUCache] = {
+            "member": LRUCache(
+                self.config.getint("CACHE", "member_size", fallback=10000), ttl
+            ),
+            "user": LRUCache(
+                self.config.getint("CACHE", "user_size", fallback=10000), ttl
+            ),
+        }
+        self.lookup = UserLookup(
+            self, self.config.getfloat("CACHE", "not_found_ttl", fallback=60)
+        )
 
         self.guild_bans: dict[int, dict] = {}
 
-        self.prefix: dict[int, str] = {
-            guild: prefix
-            for guild, prefix in await self.pool.fetch(
-                "SELECT guild, prefix FROM guilds"
-            )
-        }
-
-        self.admins: dict[int, dict[str, int]] = {
-            guild: {"admin": admin, "mod": mod}
-            for guild, admin, mod in await self.pool.fetch(
-                "SELECT guild, admins, mods FROM guilds"
-            )
-        }
+        await self.guild_config.load()
 
 
 
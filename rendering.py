@@ -0,0 +1,311 @@
+import asyncio
+import io
+import math
+import multiprocessing
+import textwrap
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+
+
+class AssetRegistry:
+    """
+    A cache of images and fonts used when rendering
+    cards that are built once and shared between calls.
+    -----------------------------
+
+    Images returned by :method:`background` are shared
+    and must be copied before being drawn on.
+    """
+
+    def __init__(self) -> None:
+        self._backgrounds: dict[Tuple[str, Tuple[int, int], int], Image.Image] = {}
+        self._fonts: dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+
+    def background(
+        self, path: str, size: Tuple[int, int], blur: int = 0
+    ) -> Image.Image:
+        """
+        Returns the image at `path` resized to `size`
+        and blurred by `blur`, building it on first use.
+        """
+        key = (path, size, blur)
+        image = self._backgrounds.get(key)
+        if image is None:
+            with Image.open(path) as source:
+                image = source.convert("RGB").resize(size)
+
+            if blur:
+                image = image.filter(ImageFilter.GaussianBlur(radius=blur))
+
+            self._backgrounds[key] = image
+
+        return image
+
+    def font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        Returns the TrueType font at `path` in `size`,
+        loading it from disk on first use.
+        """
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = ImageFont.truetype(path, size)
+
+        return font
+
+
+assets = AssetRegistry()
+
+CARD_SIZE = (1920, 1080)
+
+
+def warm_assets() -> None:
+    """
+    Builds the assets every card needs. Ran once
+    in each rendering process as it starts.
+    """
+    assets.background("gradientBig.jpg", CARD_SIZE, blur=10)
+    assets.font("Ubuntu-Medium.ttf", 92)
+    assets.font("Ubuntu-Light.ttf", 100)
+    assets.font("Ubuntu-Light.ttf", 64)
+
+
+### Render specs
+
+
+@dataclass(frozen=True)
+class RankCardSpec:
+    """
+    Everything visible on a `/level` rank card. Specs
+    that compare equal render to identical images.
+    """
+
+    display_name: str
+    guild_name: str
+    level: int
+    progress: int
+
+    @classmethod
+    def create(
+        cls, display_name: str, guild_name: str, level: int, messages: int
+    ) -> "RankCardSpec":
+        """
+        Builds a spec with progress rounded to the pixel
+        where the progress bar ends.
+        """
+        progress = round(CARD_SIZE[0] / 5 * 4 / (math.pow(level, 2) / messages))
+        return cls(display_name, guild_name, level, progress)
+
+
+@dataclass(frozen=True)
+class QuoteSpec:
+    """
+    The quote text and the encoded background
+    image of a `/quote` image.
+    """
+
+    content: str
+    author: str
+    image: bytes
+
+
+def render_rank_card(spec: RankCardSpec) -> bytes:
+    """
+    Returns a PNG encoded rank card.
+    """
+    image = assets.background("gradientBig.jpg", CARD_SIZE, blur=10).copy()
+    draw = ImageDraw.Draw(image)
+    font = assets.font("Ubuntu-Medium.ttf", 92)
+    margin = offset = image.width / 4
+    for line in textwrap.wrap(spec.display_name, width=40):
+        draw.text((margin, offset), line, font=font, fill=(255, 255, 255))
+        offset += font.getsize(line)[1]
+
+    draw.text(
+        ((image.width / 4) * 3, offset),
+        f"Level {spec.level}",
+        font=font,
+        fill=(255, 255, 255),
+        align="right",
+    )
+    draw.text(
+        ((image.height / 10) * 1, (image.width / 10) * 1),
+        spec.guild_name,
+        font=font,
+        fill=(255, 255, 255),
+        align="left",
+    )
+    draw.rounded_rectangle(
+        (
+            (image.width / 5, image.height / 5 * 4),
+            (spec.progress, image.height / 5 * 4 - 100),
+        ),
+        fill=(0, 0, 0),
+        width=5,
+        radius=1,
+        outline="black",
+    )
+
+    buffer = io.BytesIO()
+    image.save(buffer, "png")
+    return buffer.getvalue()
+
+
+def render_quote(spec: QuoteSpec) -> bytes:
+    """
+    Returns a JPEG encoded quote image.
+    """
+    image = Image.open(io.BytesIO(spec.image))
+    # Lets the JPEG decoder scale down by up to 8x while decoding.
+    image.draft("RGB", CARD_SIZE)
+    image = ImageOps.fit(image.convert("RGB"), CARD_SIZE, Image.LANCZOS)
+    image = image.filter(ImageFilter.GaussianBlur(radius=10))
+    draw = ImageDraw.Draw(image)
+    font = assets.font("Ubuntu-Light.ttf", 100)
+    margin = offset = image.width / 4
+    for line in textwrap.wrap(spec.content, width=40):
+        draw.text((margin, offset), line, font=font, fill=(255, 255, 255))
+        offset += font.getsize(line)[1]
+
+    # Write the quote author
+    font = assets.font("Ubuntu-Light.ttf", 64)
+    draw.text(
+        ((image.width / 4) * 3, offset),
+        spec.author,
+        font=font,
+        fill=(255, 255, 255),
+        align="right",
+    )
+
+    buffer = io.BytesIO()
+    image.save(buffer, "jpeg", quality=75)
+    return buffer.getvalue()
+
+
+### Renderer
+
+
+class RenderError(Exception):
+    """
+    Base exception for failures raised by :class:`Renderer`.
+    """
+
+
+class RendererBusy(RenderError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Too many images are being made right now, try again shortly."
+        )
+
+
+class RenderTimeout(RenderError):
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"Making the image took longer than {timeout:g} seconds.")
+
+
+class Renderer:
+    """
+    Renders images in a pool of worker processes so
+    PIL work never blocks the event loop.
+    -----------------------------
+
+    Attributes
+
+    max_pending: :class:`int`
+        The most jobs queued or running at once. Further
+        jobs are rejected with :class:`RendererBusy`.
+
+    timeout: :class:`float`
+        Seconds a caller waits for a job before
+        :class:`RenderTimeout` is raised.
+
+    pending: :class:`int`
+        Jobs currently queued or running.
+    """
+
+    def __init__(
+        self, workers: int = 2, max_pending: int = 16, timeout: float = 30
+    ) -> None:
+        # Workers are not forked from the bot, whose threads, pools and
+        # sessions a forked child would copy and could deadlock on.
+        method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        self.executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=warm_assets,
+        )
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self.pending = 0
+        self.rendered = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.latencies: deque[float] = deque(maxlen=256)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    async def render(self, function: Callable[[Any], bytes], spec: Any) -> bytes:
+        """
+        |coro|
+
+        Runs `function(spec)` in a worker process and
+        returns the encoded image it produced.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise RendererBusy()
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        future = self.executor.submit(function, spec)
+        self.pending += 1
+        # Released once the worker is actually free, even if the caller timed out.
+        future.add_done_callback(
+            lambda _: loop.is_closed() or loop.call_soon_threadsafe(self._release)
+        )
+
+        try:
+            data = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise RenderTimeout(self.timeout) from None
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.rendered += 1
+        self.latencies.append(time.perf_counter() - started)
+        return data
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns queue depth, counters and render
+        latency over the most recent jobs in milliseconds.
+        """
+        latencies = sorted(self.latencies) or [0]
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        }
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
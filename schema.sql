@@ -2,6 +2,8 @@ CREATE TABLE IF NOT EXISTS guilds (
     guild bigint NOT NULL,
     prefix text,
     logs bigint,
+    log_webhook text,
+    log_events bigint,
     timezone text,
     mute bigint,
     admins bigint,
@@ -11,9 +13,15 @@ CREATE TABLE IF NOT EXISTS guilds (
     welcome text,
     goodbye text,
     ticket_message text,
+    ticket_category bigint,
+    twitch_channel bigint,
+    commands text[],
     CONSTRAINT guilds_pkey PRIMARY KEY (guild)
 );
 
+ALTER TABLE guilds ADD COLUMN IF NOT EXISTS log_webhook text;
+ALTER TABLE guilds ADD COLUMN IF NOT EXISTS log_events bigint;
+
 CREATE TABLE IF NOT EXISTS mutes (
     guild bigint,
     muted bigint,
@@ -56,6 +64,14 @@ CREATE TABLE IF NOT EXISTS twitch (
     notified boolean
 );
 
+CREATE TABLE IF NOT EXISTS levels (
+    guild bigint NOT NULL,
+    user_id bigint NOT NULL,
+    level bigint,
+    messages bigint,
+    CONSTRAINT levels_pkey PRIMARY KEY (guild, user_id)
+);
+
 CREATE TABLE IF NOT EXISTS lastfm (
     user_id bigint NOT NULL,
     lastfm_user text,
@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+import discord
+
+Entry = Tuple[float, discord.Embed]
+
+
+class LogSpool:
+    """
+    Append-only files of queued log embeds, one per guild,
+    used for events that do not fit in memory and for events
+    still pending when the :class:`Events` cog is unloaded.
+    -----------------------------
+
+    Entries are stored as JSON lines with the wall clock time
+    they were queued, so they can be replayed after a restart
+    and still report how long they waited. Appended entries are
+    buffered and written in one batch per guild by :method:`write`,
+    which :method:`take` and :method:`persist` call first.
+
+    Attributes
+
+    path: :class:`str`
+        The directory holding the spool files.
+
+    sizes: :class:`dict`
+        Guild ID -> entries spooled and not taken yet.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.sizes: dict[int, int] = {}
+        self._offsets: dict[int, int] = {}
+        self._buffers: dict[int, List[Entry]] = {}
+
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.endswith(".jsonl") and name[:-6].isdigit():
+                with open(os.path.join(path, name), encoding="utf-8") as file:
+                    self.sizes[int(name[:-6])] = sum(1 for _ in file)
+
+    def _file(self, guild: int) -> str:
+        return os.path.join(self.path, f"{guild}.jsonl")
+
+    def size(self, guild: int) -> int:
+        return self.sizes.get(guild, 0)
+
+    @staticmethod
+    def _encode(entries: List[Entry]) -> List[str]:
+        offset = time.time() - time.monotonic()
+        return [
+            json.dumps({"queued": queued + offset, "embed": embed.to_dict()}) + "\n"
+            for queued, embed in entries
+        ]
+
+    @staticmethod
+    def _decode(line: str) -> Entry:
+        data = json.loads(line)
+        queued = data["queued"] - (time.time() - time.monotonic())
+        return queued, discord.Embed.from_dict(data["embed"])
+
+    def append(self, guild: int, entries: List[Entry]) -> None:
+        """
+        Adds entries to the end of a guild's spool.
+        """
+        self._buffers.setdefault(guild, []).extend(entries)
+        self.sizes[guild] = self.size(guild) + len(entries)
+
+    def write(self, guild: Optional[int] = None) -> None:
+        """
+        Writes the buffered entries of a guild, or of
+        every guild, to disk with a single append each.
+        """
+        guilds = list(self._buffers) if guild is None else [guild]
+        for guild in guilds:
+            entries = self._buffers.pop(guild, None)
+            if entries:
+                with open(self._file(guild), "a", encoding="utf-8") as file:
+                    file.writelines(self._encode(entries))
+
+    def take(self, guild: int, limit: int) -> List[Entry]:
+        """
+        Removes and returns up to `limit` of the oldest
+        entries of a guild's spool.
+        """
+        if not self.size(guild) or limit < 1:
+            return []
+
+        self.write(guild)
+        lines = []
+        with open(self._file(guild), encoding="utf-8") as file:
+            file.seek(self._offsets.get(guild, 0))
+            while len(lines) < limit:
+                line = file.readline()
+                if not line:
+                    break
+
+                lines.append(line)
+
+            offset = file.tell()
+            # Once most of the file has been taken, the rest is rewritten
+            # so a spool that never empties does not grow without bound.
+            rest = file.read() if offset * 2 > os.fstat(file.fileno()).st_size else None
+
+        self.sizes[guild] -= len(lines)
+        if self.sizes[guild] <= 0:
+            self.discard(guild)
+        elif rest is not None:
+            path = self._file(guild)
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                file.write(rest)
+
+            os.replace(path + ".tmp", path)
+            self._offsets[guild] = 0
+        else:
+            self._offsets[guild] = offset
+
+        entries = []
+        for line in lines:
+            try:
+                entries.append(self._decode(line))
+            except ValueError:
+                # A line cut short by a crash while it was being written.
+                continue
+
+        return entries
+
+    def discard(self, guild: int) -> int:
+        """
+        Deletes a guild's spool and returns how
+        many entries it still held.
+        """
+        size = self.sizes.pop(guild, 0)
+        self._offsets.pop(guild, None)
+        self._buffers.pop(guild, None)
+        try:
+            os.remove(self._file(guild))
+        except FileNotFoundError:
+            pass
+
+        return size
+
+    def persist(self, guild: int, entries: List[Entry]) -> None:
+        """
+        Writes entries still held in memory ahead of
+        the rest of a guild's spool so nothing is lost
+        on shutdown and order is kept.
+        """
+        rest = self.take(guild, self.size(guild))
+        if not entries and not rest:
+            return
+
+        path = self._file(guild)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            file.writelines(self._encode([*entries, *rest]))
+
+        os.replace(path + ".tmp", path)
+        self.sizes[guild] = len(entries) + len(rest)
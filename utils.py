@@ -255,11 +255,8 @@ class MemberConverter(commands.Converter):
             pass
 
         try:
-            user_id = int(argument)
-            member = await context.guild.fetch_member(user_id)
-            cache.update({member.id: member})
-            return member
-        except (discord.NotFound, ValueError):
+            return await context.bot.lookup.fetch_member(context.guild, int(argument))
+        except ValueError:
             pass
 
 
@@ -284,21 +281,7 @@ class UserConverter(commands.Converter):
     async def find_user(
         self, context: commands.Context, user_id: int
     ) -> Optional[Union[discord.User, None]]:
-
-        cache: dict[int, discord.User] = context.bot.cache["user"]
-        cached_user = cache.get(user_id)
-        if cached_user:
-            return cached_user
-
-        try:
-            user: discord.User = await context.bot.fetch_user(user_id)
-            if user:
-                cache.update({user.id: user})
-                return user
-        except discord.NotFound:
-            pass
-
-        return None
+        return await context.bot.lookup.fetch_user(user_id)
 
 
 class BannedUserConverter(commands.Converter):
@@ -1,6 +1,7 @@
 import socketio
 import asyncio
 from configparser import ConfigParser
+from cache import LOG_EVENTS, log_events_mask
 from postgre import Database
 from threading import Thread
 from discord import TextChannel, Embed, Color, Guild, Role
@@ -33,7 +34,34 @@ class Comms:
                     data["value"],
                     int(data["guild_id"]),
                 )
-                bot.prefix.update({int(data["guild_id"]): data["value"]})
+                bot.guild_config.apply(int(data["guild_id"]), prefix=data["value"])
+
+            elif data["key"] == "log-events":
+                # Either a list of event type names or the raw mask.
+                value = data["value"]
+                if isinstance(value, list):
+                    try:
+                        value = log_events_mask(value)
+                    except ValueError as error:
+                        print("Ignored log-events change:", error)
+                        return
+
+                elif isinstance(value, int) and not isinstance(value, bool):
+                    # Unknown bits are dropped so only real groups are stored.
+                    value &= sum(LOG_EVENTS.values())
+
+                elif value is not None:
+                    print("Ignored log-events change:", value)
+                    return
+
+                # Guilds without a row yet get one, so the change is not lost.
+                await self.pool.execute(
+                    "INSERT INTO guilds (guild, log_events) VALUES ($1, $2) "
+                    "ON CONFLICT (guild) DO UPDATE SET log_events = EXCLUDED.log_events",
+                    int(data["guild_id"]),
+                    value,
+                )
+                bot.guild_config.apply(int(data["guild_id"]), log_events=value)
 
         @sio.on("getAllCommands")
         async def getAllCommands(data):